@@ -147,7 +147,8 @@ class BitIOReader(BitIO):
             data = self.data.read(num)
             self._tell += len(data) << 3
             return data
-        return bytes(self.read(8) for _ in range(num))
+        # Unaligned data is read in one go and then split into bytes.
+        return self.read(num << 3).to_bytes(num, "little")
 
 
 class BitIOWriter(BitIO):
@@ -211,8 +212,7 @@ class BitIOWriter(BitIO):
             self.data.write(buf)
             self._tell += len(buf) << 3
             return
-        for byt in buf:
-            self.write(8, byt)
+        self.write(len(buf) << 3, int.from_bytes(buf, "little"))
 
     def close(self) -> None:
         """Flush any pending bits and close the underlying stream
@@ -3,8 +3,9 @@ level files.
 """
 
 import io
+import struct
 import zlib
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from . import replay
 from .bitio import BitIOReader
@@ -13,7 +14,7 @@ from .exceptions import LevelParseException
 from .level import Level, LevelType
 from .prop import Prop
 from .replay import Replay
-from .tile import Tile, TileShape
+from .tile import _TILE_SHAPES, Tile
 from .variable import (
     Variable,
     VariableArray,
@@ -27,6 +28,24 @@ from .variable import (
     VariableVec2,
 )
 
+#: Characters of a '6-bit' string indexed by their encoded value.
+_6BIT_CHARS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz{"
+
+#: Variable types indexed by their 4-bit type ID, None for unused IDs.
+_VARIABLE_TYPES: Tuple[Optional[VariableType], ...] = tuple(
+    {vtype.value: vtype for vtype in VariableType}.get(type_id) for type_id in range(16)
+)
+
+#: Prop scale factors indexed by their encoded logarithmic scale.
+_PROP_SCALES = tuple(pow(50.0, (scale_lg - 32.0) / 24.0) for scale_lg in range(64))
+
+#: Largest possible expansion factor of deflate compressed data.
+_ZLIB_MAX_RATIO = 1032
+
+#: Layout of an entity desync frame within a replay; frame timer followed by
+#: the fixed-point position and speed.
+_ENTITY_FRAME_STRUCT = struct.Struct("<I4i")
+
 
 class DFReader(BitIOReader):
     """Helper class to read Dustforce binary files"""
@@ -47,9 +66,10 @@ class DFReader(BitIOReader):
             ibits (int): Number of integer bits
             fbits (int): Number of fractional bits
         """
-        sign = 1 - 2 * self.read(1)
-        ipart = self.read(ibits - 1)
-        fpart = self.read(fbits)
+        val = self.read(ibits + fbits)
+        sign = 1 - 2 * (val & 0x1)
+        ipart = (val >> 1) & ((1 << (ibits - 1)) - 1)
+        fpart = val >> ibits
         return sign * ipart + 1.0 * fpart / (1 << (fbits - 1))
 
     def read_6bit_str(self) -> str:
@@ -58,20 +78,8 @@ class DFReader(BitIOReader):
         characters in addition to '_' and '{'.
         """
         ln = self.read(6)
-        chrs = []
-        for _ in range(ln):
-            v = self.read(6)
-            if v < 10:
-                chrs.append(chr(ord("0") + v))
-            elif v < 36:
-                chrs.append(chr(ord("A") + v - 10))
-            elif v == 36:
-                chrs.append("_")
-            elif v < 63:
-                chrs.append(chr(ord("a") + v - 37))
-            else:
-                chrs.append("{")
-        return "".join(chrs)
+        val = self.read(6 * ln)
+        return "".join(_6BIT_CHARS[(val >> (6 * i)) & 0x3F] for i in range(ln))
 
     def read_variable(self, vtype: VariableType) -> Variable:
         """Read a variable of a given type.
@@ -79,75 +87,119 @@ class DFReader(BitIOReader):
         Arguments:
             vtype (VariableType): The type of variable to read
         """
-        max_width = (2**16) - 1
-        if vtype == VariableType.NULL:
-            raise LevelParseException("unexpected null variable")
-        if vtype == VariableType.BOOL:
-            return VariableBool(self.read(1) == 1)
-        if vtype == VariableType.UINT:
-            return VariableUInt(self.read(32))
-        if vtype == VariableType.INT:
-            return VariableInt(self.read(32, True))
-        if vtype == VariableType.FLOAT:
-            return VariableFloat(self.read_float(32, 32))
-
-        if vtype == VariableType.STRING:
-            slen = self.read(16)
-            return VariableString(self.read_bytes(slen))
-
-        if vtype == VariableType.VEC2:
-            f0 = self.read_float(32, 32)
-            f1 = self.read_float(32, 32)
-            return VariableVec2((f0, f1))
-
-        if vtype == VariableType.ARRAY:
-            atype = VariableType(self.read(4))
-            alen = self.read(16)
-            val: List[Variable] = []
-
-            if atype != VariableType.STRING:
-                val.extend(self.read_variable(atype) for _ in range(alen))
-            else:
-                while alen > 0:
-                    var_value_ctns = []
-                    while alen > 0:
-                        alen -= 1
-                        value_part = self.read_variable(atype).value
-                        var_value_ctns.append(value_part)
-                        if len(value_part) < max_width:
-                            break
-
-                    val.append(VariableString(b"".join(var_value_ctns)))
+        reader = _VARIABLE_READERS.get(vtype)
+        if reader is None:
+            if vtype == VariableType.NULL:
+                raise LevelParseException("unexpected null variable")
+            raise LevelParseException("unknown var type")
+        return reader(self)
 
-            return VariableArray(Variable._TYPES[atype], val)
+    def _read_variable_type(self) -> VariableType:
+        """Read a 4-bit variable type ID.
 
-        if vtype == VariableType.STRUCT:
-            result: Dict[str, Variable] = {}
-            while True:
-                vtype = VariableType(self.read(4))
-                if vtype == VariableType.NULL:
-                    break
+        Raises:
+            LevelParseException: If the type ID is not a known variable type.
+        """
+        vtype = _VARIABLE_TYPES[self.read(4)]
+        if vtype is None:
+            raise LevelParseException("unknown var type")
+        return vtype
+
+    def _read_variable_bool(self) -> Variable:
+        """Read the value of a :class:`VariableBool`."""
+        return VariableBool(self.read(1) == 1)
+
+    def _read_variable_uint(self) -> Variable:
+        """Read the value of a :class:`VariableUInt`."""
+        return VariableUInt(self.read(32))
+
+    def _read_variable_int(self) -> Variable:
+        """Read the value of a :class:`VariableInt`."""
+        return VariableInt(self.read(32, True))
+
+    def _read_variable_float(self) -> Variable:
+        """Read the value of a :class:`VariableFloat`."""
+        return VariableFloat(self.read_float(32, 32))
+
+    def _read_variable_string(self) -> Variable:
+        """Read the value of a :class:`VariableString`."""
+        slen = self.read(16)
+        return VariableString(self.read_bytes(slen))
+
+    def _read_variable_vec2(self) -> Variable:
+        """Read the value of a :class:`VariableVec2`."""
+        f0 = self.read_float(32, 32)
+        f1 = self.read_float(32, 32)
+        return VariableVec2((f0, f1))
+
+    def _read_variable_array(self) -> Variable:
+        """Read the value of a :class:`VariableArray`."""
+        max_width = (2**16) - 1
+        atype = self._read_variable_type()
+        alen = self.read(16)
+        val: List[Variable] = []
 
-                var_name = self.read_6bit_str()
-                if vtype != VariableType.STRING:
-                    result[var_name] = self.read_variable(vtype)
+        if atype != VariableType.STRING:
+            val.extend(self.read_variable(atype) for _ in range(alen))
+        else:
+            while alen > 0:
+                alen -= 1
+                first_part = self.read_variable(atype)
+                if len(first_part.value) < max_width:
+                    # Common case of a string without continuations.
+                    val.append(first_part)
                     continue
 
-                var_value_ctns = []
-                while True:
-                    value_part = self.read_variable(vtype)
-                    var_value_ctns.append(value_part.value)
-                    if len(value_part.value) < max_width:
+                var_value_ctns = [first_part.value]
+                while alen > 0:
+                    alen -= 1
+                    value_part = self.read_variable(atype).value
+                    var_value_ctns.append(value_part)
+                    if len(value_part) < max_width:
                         break
 
-                    self.read(4)
-                    self.read_6bit_str()
+                val.append(VariableString(b"".join(var_value_ctns)))
 
-                result[var_name] = VariableString(b"".join(var_value_ctns))
+        return VariableArray(Variable._TYPES[atype], val)
+
+    def _read_variable_struct(self) -> Variable:
+        """Read the value of a :class:`VariableStruct`."""
+        max_width = (2**16) - 1
+        read = self.read
+        read_variable_type = self._read_variable_type
+        read_6bit_str = self.read_6bit_str
+        read_variable = self.read_variable
+
+        result: Dict[str, Variable] = {}
+        while True:
+            vtype = read_variable_type()
+            if vtype == VariableType.NULL:
+                break
+
+            var_name = read_6bit_str()
+            if vtype != VariableType.STRING:
+                result[var_name] = read_variable(vtype)
+                continue
+
+            value_part = read_variable(vtype)
+            if len(value_part.value) < max_width:
+                # Common case of a string without continuations.
+                result[var_name] = value_part
+                continue
+
+            var_value_ctns = [value_part.value]
+            while True:
+                read(4)
+                read_6bit_str()
+
+                value_part = read_variable(vtype)
+                var_value_ctns.append(value_part.value)
+                if len(value_part.value) < max_width:
+                    break
 
-            return VariableStruct(result)
+            result[var_name] = VariableString(b"".join(var_value_ctns))
 
-        raise LevelParseException("unknown var type")
+        return VariableStruct(result)
 
     def read_variable_map(self) -> Dict[str, Variable]:
         """Convenience method equivalent to `read_variable(VariableType.STRUCT).value`"""
@@ -180,32 +232,43 @@ class DFReader(BitIOReader):
 
         flags = self.read(32)
         if flags & 1:
+            decoded_tiles: Dict[int, Tile] = {}
             layers = self.read(8)
             for _ in range(layers):
                 layer = self.read(8)
                 tiles = self.read(10)
 
+                # Each tile record is read with a single call and then split
+                # into its 5/5/5/3 bit header fields and 12 byte payload.
+                # Most tiles in a segment repeat a handful of records so each
+                # distinct record is only decoded once and then cloned.
                 for _ in range(tiles):
-                    txpos = self.read(5)
-                    typos = self.read(5)
-                    shape = self.read(5)
-                    tile_flags = self.read(3)
-                    data = self.read_bytes(12)
-                    level.tiles[(layer, xoffset + txpos, yoffset + typos)] = Tile(
-                        TileShape(shape & 0x1F),
-                        tile_flags=tile_flags,
-                        _tile_data=data,
+                    rec = self.read(114)
+                    txpos = rec & 0x1F
+                    typos = (rec >> 5) & 0x1F
+                    tile = decoded_tiles.get(rec >> 10)
+                    if tile is None:
+                        shape = (rec >> 10) & 0x1F
+                        if shape >= len(_TILE_SHAPES):
+                            raise LevelParseException(f"unknown tile shape {shape}")
+                        tile = decoded_tiles[rec >> 10] = Tile(
+                            _TILE_SHAPES[shape],
+                            tile_flags=(rec >> 15) & 0x7,
+                            _tile_data=(rec >> 18).to_bytes(12, "little"),
+                        )
+                    level.tiles[(layer, xoffset + txpos, yoffset + typos)] = (
+                        tile.clone()
                     )
 
         if flags & 2:
             dusts = self.read(10)
             for _ in range(dusts):
-                txpos = self.read(5)
-                typos = self.read(5)
-                data = self.read_bytes(12)
+                rec = self.read(106)
+                txpos = rec & 0x1F
+                typos = (rec >> 5) & 0x1F
                 tile = level.tiles.get((19, xoffset + txpos, yoffset + typos))
                 if tile is not None:
-                    tile._unpack_dust_data(data)
+                    tile._unpack_dust_data((rec >> 10).to_bytes(12, "little"))
 
         if flags & 8:
             props = self.read(16)
@@ -214,34 +277,39 @@ class DFReader(BitIOReader):
                 if id_num < 0:
                     continue
 
-                layer = self.read(8)
-                layer_sub = self.read(8)
+                rec = self.read(16)
+                layer = rec & 0xFF
+                layer_sub = rec >> 8
 
                 scale = 1.0
                 if version > 6 or level.level_type == LevelType.DUSTMOD:
-                    x_sgn = self.read(1)
-                    x_int = self.read(27)
-                    x_scale = (self.read(4) & 0x7) ^ 0x4
-                    y_sgn = self.read(1)
-                    y_int = self.read(27)
-                    y_scale = (self.read(4) & 0x7) ^ 0x4
+                    # Two 1/27/4 bit sign, integer, scale triples.
+                    rec = self.read(64)
+                    x_sgn = rec & 0x1
+                    x_int = (rec >> 1) & 0x7FFFFFF
+                    x_scale = ((rec >> 28) & 0x7) ^ 0x4
+                    y_sgn = (rec >> 32) & 0x1
+                    y_int = (rec >> 33) & 0x7FFFFFF
+                    y_scale = ((rec >> 60) & 0x7) ^ 0x4
 
                     xpos = (-1.0 if x_sgn != 0 else 1.0) * x_int
                     ypos = (-1.0 if y_sgn != 0 else 1.0) * y_int
 
                     scale_lg = x_scale * 7 + y_scale
-                    scale = pow(50.0, (scale_lg - 32.0) / 24.0)
+                    scale = _PROP_SCALES[scale_lg]
                 else:
                     xpos = self.read_float(28, 4)
                     ypos = self.read_float(28, 4)
 
-                rotation = self.read(16)
-                flip_x = self.read(1) != 0
-                flip_y = self.read(1) != 0
-                prop_set = self.read(8)
-                prop_group = self.read(12)
-                prop_index = self.read(12)
-                palette = self.read(8)
+                # Fields are 16/1/1/8/12/12/8 bits wide.
+                rec = self.read(58)
+                rotation = rec & 0xFFFF
+                flip_x = (rec >> 16) & 0x1 != 0
+                flip_y = (rec >> 17) & 0x1 != 0
+                prop_set = (rec >> 18) & 0xFF
+                prop_group = (rec >> 26) & 0xFFF
+                prop_index = (rec >> 38) & 0xFFF
+                palette = rec >> 50
 
                 # Default DF behavior is to overwrite repeated props
                 level.props.pop(id_num, None)
@@ -328,15 +396,22 @@ class DFReader(BitIOReader):
             level (Level): The level object to read data into
         """
         region_len = self.read(32)
-        uncompressed_len = self.read(32)  # pylint: disable=unused-variable
+        uncompressed_len = self.read(32)
         offx = self.read(16, True)
         offy = self.read(16, True)
         version = self.read(16)  # pylint: disable=unused-variable
         segments = self.read(16)
         has_backdrop = self.read(8) != 0
 
+        # The region header tells us the decompressed size so let zlib
+        # allocate its output buffer at the right size up front. zlib
+        # allocates the full hint immediately so cap it at the most the
+        # compressed data could possibly inflate to, keeping a corrupt header
+        # from triggering a huge allocation.
+        compressed_data = self.read_bytes(region_len - 17)
+        bufsize = min(uncompressed_len, len(compressed_data) * _ZLIB_MAX_RATIO)
         sub_reader = DFReader(
-            io.BytesIO(zlib.decompress(self.read_bytes(region_len - 17)))
+            io.BytesIO(zlib.decompress(compressed_data, bufsize=bufsize))
         )
         for _ in range(segments):
             sub_reader.align()
@@ -509,11 +584,24 @@ class DFReader(BitIOReader):
         else:
             # Decompress the next gzip block. Unfortunately the replay format
             # doesn't tell us how many bytes we need to decompress so we just have
-            # to figure it out which is a bit inefficient.
+            # to figure it out. If the stream is seekable read ahead in large
+            # chunks and seek back over whatever followed the compressed data.
+            try:
+                seekable = self.data.seekable()
+            except AttributeError:
+                # mmap objects only gained seekable() in Python 3.13.
+                seekable = hasattr(self.data, "seek")
+            chunk_size = 0x4000 if seekable and self.aligned() else 1
+
             input_data = bytearray()
             decomp = zlib.decompressobj()
             while not decomp.eof:
-                input_data += decomp.decompress(self.read_bytes(1))
+                chunk = self.read_bytes(chunk_size)
+                if not chunk:
+                    raise LevelParseException("unexpected end of replay data")
+                input_data += decomp.decompress(chunk)
+            if decomp.unused_data:
+                self.bit_seek(self.bit_tell() - 8 * len(decomp.unused_data))
 
         with DFReader(io.BytesIO(input_data)) as sub_reader:
             inputs_len = sub_reader.read(32)  # pylint: disable=unused-variable
@@ -529,17 +617,21 @@ class DFReader(BitIOReader):
                         replay.IntentStream(intent), []
                     )
 
-                    first = True
-                    state = intent_meta.default
-                    while True:
-                        count = sub_reader.read(8)
-                        if count == 0xFF:
-                            break
-                        if not first:
-                            count += 1
-                        first = False
-                        intent_values.extend(state for _ in range(count))
-                        state = intent_meta.to_repr(sub_reader.read(intent_meta.bits))
+                    # Each run value is immediately followed by the length
+                    # byte of the next run so read them together.
+                    bits = intent_meta.bits
+                    mask = (1 << bits) - 1
+                    to_repr = intent_meta.to_repr
+                    if intent_meta.repr_table is not None:
+                        to_repr = intent_meta.repr_table.__getitem__
+                    count = sub_reader.read(8)
+                    if count != 0xFF:
+                        intent_values.extend([intent_meta.default] * count)
+                    while count != 0xFF:
+                        rec = sub_reader.read(bits + 8)
+                        count = rec >> bits
+                        if count != 0xFF:
+                            intent_values.extend([to_repr(rec & mask)] * (count + 1))
 
                     sub_reader.bit_seek(next_pos)
 
@@ -550,25 +642,36 @@ class DFReader(BitIOReader):
                 frame_count = sub_reader.read(32)
 
                 entity = rep.entities.setdefault(entity_uid, replay.EntityData())
-                for _ in range(frame_count):
-                    entity_frame = sub_reader.read(32)
-                    entity_x = sub_reader.read(32, signed=True)
-                    entity_y = sub_reader.read(32, signed=True)
-                    entity_x_speed = sub_reader.read(32, signed=True)
-                    entity_y_speed = sub_reader.read(32, signed=True)
+                frame_values = _ENTITY_FRAME_STRUCT.iter_unpack(
+                    sub_reader.read_bytes(frame_count * _ENTITY_FRAME_STRUCT.size)
+                )
+                for frame, x_pos, y_pos, x_speed, y_speed in frame_values:
                     entity.frames.append(
                         replay.EntityFrame(
-                            frame=entity_frame,
-                            x_pos=entity_x / 10.0,
-                            y_pos=entity_y / 10.0,
-                            x_speed=entity_x_speed / 100.0,
-                            y_speed=entity_y_speed / 100.0,
+                            frame=frame,
+                            x_pos=x_pos / 10.0,
+                            y_pos=y_pos / 10.0,
+                            x_speed=x_speed / 100.0,
+                            y_speed=y_speed / 100.0,
                         )
                     )
 
         return rep
 
 
+#: Reader method for each variable type keyed by type ID.
+_VARIABLE_READERS: Dict[VariableType, Callable[[DFReader], Variable]] = {
+    VariableType.BOOL: DFReader._read_variable_bool,
+    VariableType.UINT: DFReader._read_variable_uint,
+    VariableType.INT: DFReader._read_variable_int,
+    VariableType.FLOAT: DFReader._read_variable_float,
+    VariableType.STRING: DFReader._read_variable_string,
+    VariableType.VEC2: DFReader._read_variable_vec2,
+    VariableType.ARRAY: DFReader._read_variable_array,
+    VariableType.STRUCT: DFReader._read_variable_struct,
+}
+
+
 def read_level(data: bytes) -> Level:
     """Convenience function to read in a level from bytes directly
 
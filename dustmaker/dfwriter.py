@@ -7,7 +7,7 @@ import io
 import itertools
 import zlib
 from math import floor, log
-from typing import Dict, Iterable, List, Tuple, Union
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Type, Union
 
 from . import replay
 from .bitio import BitIOWriter
@@ -15,24 +15,30 @@ from .exceptions import LevelParseException
 from .level import Level
 from .replay import Replay
 from .tile import TileSpriteSet
-from .variable import (
-    Variable,
-    VariableArray,
-    VariableBool,
-    VariableFloat,
-    VariableInt,
-    VariableString,
-    VariableStruct,
-    VariableType,
-    VariableUInt,
-    VariableVec2,
-)
+from .variable import Variable, VariableString, VariableStruct, VariableType
+
+#: Encoded value of each character allowed in a '6-bit' string.
+_6BIT_CODES = {
+    ch: code
+    for code, ch in enumerate(
+        "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz{"
+    )
+}
+
+_LOG_50 = log(50.0)
+
+#: Encoded logarithmic scale of each exactly representable prop scale factor.
+_PROP_SCALE_LGS = {
+    pow(50.0, (scale_lg - 32.0) / 24.0): scale_lg for scale_lg in range(64)
+}
 
 
 class _LevelSegment:
     """Container class with raw information about a segment"""
 
     def __init__(self):
+        #: Per-layer lists of (y << 4 | x, tile) pairs using segment relative
+        #: coordinates. Sorting these orders tiles as the format requires.
         self.tiles = [[] for _ in range(256)]
         self.entities = []
         self.props = []
@@ -106,7 +112,9 @@ def _compute_region_map(level: Level) -> _RegionMap:
     """
     rmap = _RegionMap()
     for (layer, tx, ty), tile in level.tiles.items():
-        rmap.get_segment(tx, ty).tiles[layer].append((tx & 0xF, ty & 0xF, tile))
+        rmap.get_segment(tx, ty).tiles[layer].append(
+            ((ty & 0xF) << 4 | (tx & 0xF), tile)
+        )
 
     for id_num, (x, y, entity) in level.entities.items():
         rmap.get_segment(int(x / 48), int(y / 48)).entities.append(
@@ -124,7 +132,7 @@ def _compute_region_map(level: Level) -> _RegionMap:
     for (layer, x, y), tile in level.backdrop.tiles.items():
         seg = rmap.get_region(x * 16, y * 16).backdrop
         seg.present = True
-        seg.tiles[layer].append((x & 0xF, y & 0xF, tile))
+        seg.tiles[layer].append(((y & 0xF) << 4 | (x & 0xF), tile))
 
     for id_num, (layer, x, y, prop) in level.backdrop.props.items():
         seg = rmap.get_region(int(x / 48), int(y / 48)).backdrop
@@ -145,11 +153,10 @@ class DFWriter(BitIOWriter):
             fbits (int): Number of fractional bits
             val (float): The floating point number to write
         """
-        ipart = abs(floor(val))
-        fpart = int((val - floor(val)) * (2 ** (fbits - 1)))
-        self.write(1, 1 if val < 0 else 0)
-        self.write(ibits - 1, ipart)
-        self.write(fbits, fpart)
+        fl_val = floor(val)
+        ipart = abs(fl_val)
+        fpart = int((val - fl_val) * (1 << (fbits - 1)))
+        self.write(ibits + fbits, (1 if val < 0 else 0) | ipart << 1 | fpart << ibits)
 
     def write_6bit_str(self, text: str) -> None:
         """Write a '6-bit' string. These are strings with length between
@@ -163,21 +170,14 @@ class DFWriter(BitIOWriter):
         if len(text) > 63:
             raise ValueError("6-bit str too long")
 
-        self.write(6, len(text))
-        for ch in text:
-            v = ord(ch)
-            if ord("0") <= v <= ord("9"):
-                self.write(6, v - ord("0"))
-            elif ord("A") <= v <= ord("Z"):
-                self.write(6, v - ord("A") + 10)
-            elif ord("a") <= v <= ord("z"):
-                self.write(6, v - ord("a") + 37)
-            elif ch == "_":
-                self.write(6, 36)
-            elif ch == "{":
-                self.write(6, 63)
-            else:
+        # Pack the length and every character into one integer to write at once.
+        val = len(text)
+        for i, ch in enumerate(text, 1):
+            code = _6BIT_CODES.get(ch)
+            if code is None:
                 raise ValueError("invalid character in 6-bit string")
+            val |= code << (6 * i)
+        self.write(6 + 6 * len(text), val)
 
     def write_variable(self, var: Variable) -> None:
         """Write a variable to the output stream. This does not write the
@@ -195,78 +195,91 @@ class DFWriter(BitIOWriter):
                 any continuations if the element type is VariableString.
             LevelParseException: If `var` is of unknown variable type.
         """
+        writer = _VARIABLE_WRITERS.get(var._vtype)
+        if writer is None:
+            raise LevelParseException("unknown var type")
+        writer(self, var.value)
+
+    def _write_variable_bool(self, value: bool) -> None:
+        """Write the value of a :class:`VariableBool`."""
+        self.write(1, 1 if value else 0)
+
+    def _write_variable_int(self, value: int) -> None:
+        """Write the value of a :class:`VariableInt` or :class:`VariableUInt`."""
+        self.write(32, value)
+
+    def _write_variable_float(self, value: float) -> None:
+        """Write the value of a :class:`VariableFloat`."""
+        self.write_float(32, 32, value)
+
+    def _write_variable_string(self, value: bytes) -> None:
+        """Write the value of a :class:`VariableString`."""
+        if len(value) > (1 << 16) - 1:
+            raise ValueError("VariableString length too long")
+
+        self.write(16, len(value))
+        self.write_bytes(value)
+
+    def _write_variable_vec2(self, value: Tuple[float, float]) -> None:
+        """Write the value of a :class:`VariableVec2`."""
+        self.write_float(32, 32, value[0])
+        self.write_float(32, 32, value[1])
+
+    def _write_variable_array(
+        self, value: Tuple[Type[Variable], List[Variable]]
+    ) -> None:
+        """Write the value of a :class:`VariableArray`."""
         max_width = (1 << 16) - 1
-
-        value = var.value
-        if isinstance(var, VariableBool):
-            self.write(1, 1 if value else 0)
-            return
-        if isinstance(var, (VariableUInt, VariableInt)):
-            self.write(32, value)
-            return
-        if isinstance(var, VariableFloat):
-            self.write_float(32, 32, value)
-            return
-
-        if isinstance(var, VariableString):
-            if len(var.value) > max_width:
-                raise ValueError("VariableString length too long")
-
-            self.write(16, len(var.value))
-            self.write_bytes(var.value)
-            return
-
-        if isinstance(var, VariableVec2):
-            self.write_float(32, 32, value[0])
-            self.write_float(32, 32, value[1])
-            return
-
-        if isinstance(var, VariableArray):
-            atype, arr = value
-            arrlen = len(arr)
-            if atype is VariableString:
-                for x in arr:
-                    arrlen += len(x.value) // max_width
-            if arrlen > max_width:
-                raise ValueError("VariableArray length too long")
-
-            self.write(4, atype._vtype)
-            self.write(16, arrlen)
-            if atype is not VariableString:
-                for x in arr:
+        atype, arr = value
+        arrlen = len(arr)
+        if atype is VariableString:
+            for x in arr:
+                arrlen += len(x.value) // max_width
+        if arrlen > max_width:
+            raise ValueError("VariableArray length too long")
+
+        self.write(4, atype._vtype)
+        self.write(16, arrlen)
+        if atype is not VariableString:
+            for x in arr:
+                self.write_variable(x)
+        else:
+            for x in arr:
+                xs = x.value
+                if len(xs) < max_width:
                     self.write_variable(x)
-            else:
-                for x in arr:
-                    # Write array continuations
-                    xs = x.value
-                    for i in range(0, 1 + len(xs) // max_width):
-                        self.write_variable(
-                            VariableString(xs[i * max_width : (i + 1) * max_width])
-                        )
-            return
-
-        if isinstance(var, VariableStruct):
-            for elem_key, elem_var in var.value.items():
-                if not isinstance(elem_var, VariableString):
-                    self.write(4, elem_var._vtype)
-                    self.write_6bit_str(elem_key)
-                    self.write_variable(elem_var)
                     continue
 
-                # Write struct string continuations
-                xs = elem_var.value
+                # Write array continuations
                 for i in range(0, 1 + len(xs) // max_width):
-                    self.write(4, elem_var._vtype)
-                    self.write_6bit_str(elem_key)
                     self.write_variable(
                         VariableString(xs[i * max_width : (i + 1) * max_width])
                     )
 
-            self.write(4, VariableType.NULL)
-
-            return
-
-        raise LevelParseException("unknown var type")
+    def _write_variable_struct(self, value: Dict[str, Variable]) -> None:
+        """Write the value of a :class:`VariableStruct`."""
+        max_width = (1 << 16) - 1
+        for elem_key, elem_var in value.items():
+            # Only strings too long for a single variable need continuations.
+            if (
+                not isinstance(elem_var, VariableString)
+                or len(elem_var.value) < max_width
+            ):
+                self.write(4, elem_var._vtype)
+                self.write_6bit_str(elem_key)
+                self.write_variable(elem_var)
+                continue
+
+            # Write struct string continuations
+            xs = elem_var.value
+            for i in range(0, 1 + len(xs) // max_width):
+                self.write(4, elem_var._vtype)
+                self.write_6bit_str(elem_key)
+                self.write_variable(
+                    VariableString(xs[i * max_width : (i + 1) * max_width])
+                )
+
+        self.write(4, VariableType.NULL)
 
     def _write_segment(self, seg_x: int, seg_y: int, segment: _LevelSegment) -> None:
         """Write a segment to the output stream"""
@@ -289,7 +302,12 @@ class DFWriter(BitIOWriter):
                 self.write(8, layer)
                 self.write(10, len(tilelayer))
 
-                for x, y, tile in sorted(tilelayer, key=lambda x: (x[1], x[0])):
+                # Positions are unique within a layer so this only ever
+                # compares the packed integer positions.
+                tilelayer.sort()
+                for pos, tile in tilelayer:
+                    x = pos & 0xF
+                    y = pos >> 4
                     if layer == 19 and tile.has_filth():
                         dusts.append((x, y, tile))
                     if layer == 19:
@@ -305,20 +323,25 @@ class DFWriter(BitIOWriter):
                             if edge.solid and edge.visible:
                                 tile_surface += 1
 
-                    self.write(5, x)
-                    self.write(5, y)
-                    self.write(5, tile.shape)
-                    self.write(3, tile.tile_flags)
-                    self.write_bytes(tile._pack_tile_data())
+                    # Write the 5/5/5/3 bit header and 12 byte payload at once.
+                    self.write(
+                        114,
+                        x
+                        | y << 5
+                        | tile.shape << 10
+                        | tile.tile_flags << 15
+                        | int.from_bytes(tile._pack_tile_data(), "little") << 18,
+                    )
 
         if dusts:
             flags |= 2
 
             self.write(10, len(dusts))
             for x, y, tile in dusts:
-                self.write(5, x)
-                self.write(5, y)
-                self.write_bytes(tile._pack_dust_data())
+                self.write(
+                    106,
+                    x | y << 5 | int.from_bytes(tile._pack_dust_data(), "little") << 10,
+                )
 
         if segment.props:
             flags |= 8
@@ -326,30 +349,39 @@ class DFWriter(BitIOWriter):
             self.write(16, len(segment.props))
             for id_num, layer, x, y, prop in segment.props:
                 self.write(32, id_num)
-                self.write(8, layer)
-                self.write(8, prop.layer_sub)
+                self.write(16, layer | prop.layer_sub << 8)
 
-                scale_lg = int(round(log(prop.scale) / log(50.0) * 24.0)) + 32
+                scale_lg = _PROP_SCALE_LGS.get(prop.scale)
+                if scale_lg is None:
+                    scale_lg = int(round(log(prop.scale) / _LOG_50 * 24.0)) + 32
                 x_scale = (scale_lg // 7) ^ 0x4
                 y_scale = (scale_lg % 7) ^ 0x4
                 x_int = int(abs(x))
                 y_int = int(abs(y))
                 x_sgn = 1 if x < 0 else 0
                 y_sgn = 1 if y < 0 else 0
-                self.write(1, x_sgn)
-                self.write(27, x_int)
-                self.write(4, x_scale)
-                self.write(1, y_sgn)
-                self.write(27, y_int)
-                self.write(4, y_scale)
-
-                self.write(16, prop.rotation)
-                self.write(1, 1 if prop.flip_x else 0)
-                self.write(1, 1 if prop.flip_y else 0)
-                self.write(8, prop.prop_set)
-                self.write(12, prop.prop_group)
-                self.write(12, prop.prop_index)
-                self.write(8, prop.palette)
+                # Two 1/27/4 bit sign, integer, scale triples.
+                self.write(
+                    64,
+                    x_sgn
+                    | x_int << 1
+                    | x_scale << 28
+                    | y_sgn << 32
+                    | y_int << 33
+                    | y_scale << 60,
+                )
+
+                # Fields are 16/1/1/8/12/12/8 bits wide.
+                self.write(
+                    58,
+                    prop.rotation
+                    | (1 if prop.flip_x else 0) << 16
+                    | (1 if prop.flip_y else 0) << 17
+                    | prop.prop_set << 18
+                    | prop.prop_group << 26
+                    | prop.prop_index << 38
+                    | prop.palette << 50,
+                )
 
         if segment.entities:
             flags |= 4
@@ -409,12 +441,14 @@ class DFWriter(BitIOWriter):
                 segments_writer._write_segment(coord[0], coord[1], segment)
             if region.backdrop.present:
                 segments_writer._write_segment(0, 0, region.backdrop)
-            uncompressed_data = segments_io.getvalue()
 
-        compressed_data = zlib.compress(uncompressed_data)
+            # Compress straight out of the BytesIO buffer rather than a copy.
+            with segments_io.getbuffer() as uncompressed_data:
+                uncompressed_len = len(uncompressed_data)
+                compressed_data = zlib.compress(uncompressed_data)
 
         self.write(32, 17 + len(compressed_data))
-        self.write(32, len(uncompressed_data))
+        self.write(32, uncompressed_len)
         self.write(16, x)
         self.write(16, y)
         self.write(16, 14)
@@ -611,49 +645,48 @@ class DFWriter(BitIOWriter):
                         break
 
                     # Calculate run lengths
-                    run_count = 1
-                    run_value = intent_meta.default
-                    run_lengths = []
-                    for value in itertools.chain(
-                        player.intents.get(replay.IntentStream(intent), []), (None,)
-                    ):
-                        if value != run_value and run_count > 0:
-                            run_lengths.append(
-                                (run_count, intent_meta.to_bits(run_value))
+                    bits = intent_meta.bits
+                    mask = (1 << bits) - 1
+                    to_bits = intent_meta.to_bits
+                    bits_table = intent_meta.bits_table or {}
+                    default_bits = to_bits(intent_meta.default) & mask
+                    run_lengths = [
+                        (
+                            len(list(run)),
+                            (
+                                bits_table[value]
+                                if value in bits_table
+                                else to_bits(value) & mask
+                            ),
+                        )
+                        for value, run in itertools.groupby(
+                            itertools.chain(
+                                (intent_meta.default,),
+                                player.intents.get(replay.IntentStream(intent), []),
                             )
-                            run_count = 0
-                        run_value = value
-                        run_count += 1
+                        )
+                    ]
 
                     # Remove unneeded default inputs at the end
-                    if len(run_lengths) > 1 and run_lengths[-1][
-                        1
-                    ] == intent_meta.to_bits(intent_meta.default):
+                    if len(run_lengths) > 1 and run_lengths[-1][1] == default_bits:
                         run_lengths.pop()
 
                     start_pos = sub_writer.bit_tell()
                     sub_writer.skip(32)
 
-                    # Write run length encoding to the stream
+                    # Write run length encoding to the stream. Each value is
+                    # written together with the length byte that follows it.
                     first = True
-                    run_lengths.reverse()
-                    while run_lengths:
-                        count, value = run_lengths[-1]
-                        assert count != 0
-
-                        if not first:
-                            sub_writer.write(intent_meta.bits, value)
-                        first = False
-                        if count <= 0xFF:
-                            sub_writer.write(8, count - 1)
-                            run_lengths.pop()
-                        else:
-                            sub_writer.write(8, 0xFE)
-                            run_lengths[-1] = (count - 0xFF, value)
-                    sub_writer.write(
-                        intent_meta.bits, intent_meta.to_bits(intent_meta.default)
-                    )
-                    sub_writer.write(8, 0xFF)
+                    for count, value in run_lengths:
+                        while count > 0:
+                            chunk = min(count, 0xFF)
+                            count -= chunk
+                            if first:
+                                sub_writer.write(8, chunk - 1)
+                                first = False
+                            else:
+                                sub_writer.write(bits + 8, value | chunk - 1 << bits)
+                    sub_writer.write(bits + 8, default_bits | 0xFF << bits)
                     sub_writer.align()
 
                     end_pos = sub_writer.bit_tell()
@@ -697,6 +730,19 @@ class DFWriter(BitIOWriter):
         self.write_bytes(zlib.compress(sub_data))
 
 
+#: Writer method for each variable type keyed by type ID.
+_VARIABLE_WRITERS: Dict[VariableType, Callable[[DFWriter, Any], None]] = {
+    VariableType.BOOL: DFWriter._write_variable_bool,
+    VariableType.UINT: DFWriter._write_variable_int,
+    VariableType.INT: DFWriter._write_variable_int,
+    VariableType.FLOAT: DFWriter._write_variable_float,
+    VariableType.STRING: DFWriter._write_variable_string,
+    VariableType.VEC2: DFWriter._write_variable_vec2,
+    VariableType.ARRAY: DFWriter._write_variable_array,
+    VariableType.STRUCT: DFWriter._write_variable_struct,
+}
+
+
 def write_level(level: Level) -> bytes:
     """Convenience function to write a map file directly to bytes in memory.
 
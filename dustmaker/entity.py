@@ -4,11 +4,10 @@ object for each entity in Dustforce.
 """
 
 import copy
-import math
 from enum import IntEnum
 from typing import Dict, Optional, Tuple, Type, TypeVar, cast
 
-from .transform import TxMatrix
+from .transform import _ANGLE_TO_U16, TxMatrix
 from .variable import (
     Variable,
     VariableArray,
@@ -202,6 +201,12 @@ class Entity:
             repr(self.variables),
         )
 
+    def clone(self) -> "Entity":
+        """Returns a copy of this entity with its own copy of :attr:`variables`."""
+        result = copy.copy(self)
+        result.variables = copy.deepcopy(self.variables)
+        return result
+
     def remap_ids(self, id_map: Dict[int, int]) -> None:
         """Overridable method to allow an entity to remap any internally stored
         IDs."""
@@ -212,7 +217,7 @@ class Entity:
 
         Many subtypes will perform additional transformations on their :attr:`variables`.
         """
-        self.rotation = self.rotation - int(0x10000 * mat.angle / math.pi / 2) & 0xFFFF
+        self.rotation = self.rotation - int(mat.angle * _ANGLE_TO_U16) & 0xFFFF
         if mat.flipped:
             self.flip_y = not self.flip_y
             self.rotation = -self.rotation & 0xFFFF
@@ -2,11 +2,10 @@
 Module defining the primary interface for working with levels in dustmaker.
 """
 
-import copy
-import functools
+import itertools
 import math
 from enum import IntEnum
-from typing import Callable, Dict, Optional, Tuple, TypeVar
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
 
 from .entity import Entity, bind_prop
 from .exceptions import LevelException
@@ -15,7 +14,6 @@ from .tile import (
     SHAPE_VERTEXES,
     SIDE_CLOCKWISE_INDEX,
     Tile,
-    TileEdgeData,
     TileShape,
     TileSide,
     TileSpriteSet,
@@ -37,6 +35,101 @@ class LevelType(IntEnum):
     DUSTMOD = 6
 
 
+def _check_edge(shape: TileShape, side: TileSide) -> Tuple[bool, bool]:
+    """Gets properties of a given edge for a given shape.
+
+    Returns:
+        (exists: bool, flush: bool)
+    """
+    ind = SIDE_CLOCKWISE_INDEX[side]
+    vert_a = SHAPE_VERTEXES[shape][ind]
+    vert_b = SHAPE_VERTEXES[shape][(ind + 1) & 0x3]
+
+    if abs(vert_a[0] - vert_b[0]) + abs(vert_a[1] - vert_b[1]) <= 1:
+        return False, False
+    return True, vert_a[0] == vert_b[0] or vert_a[1] == vert_b[1]
+
+
+#: Precomputed :func:`_check_edge` results indexed by [shape][side].
+_EDGE_PROPERTIES = tuple(
+    tuple(_check_edge(shape, side) for side in TileSide) for shape in TileShape
+)
+
+
+def _join_angle(dx: int, dy: int, ndx: int, ndy: int) -> int:
+    """Computes the edge join angle between an edge with direction (dx, dy)
+    and its joining edge with direction (ndx, ndy).
+
+    Returns:
+        Half the clockwise angle delta in degrees, rounded.
+    """
+    delta_angle = (math.atan2(dy, dx) - math.atan2(ndy, ndx)) % (2 * math.pi)
+    if delta_angle > math.pi:
+        delta_angle -= 2 * math.pi
+    return -int(round(delta_angle * 180 / math.pi / 2))
+
+
+#: Precomputed :func:`_join_angle` results for every edge direction pair.
+#: Edge vertexes are in half-tile units so direction components are always
+#: in the range [-2, 2].
+_JOIN_ANGLES = {
+    deltas: _join_angle(*deltas) for deltas in itertools.product(range(-2, 3), repeat=4)
+}
+
+
+def _edge_vertexes(
+    shape: TileShape, side: TileSide, dr: int
+) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """Gets the start and end vertex of a tile edge. If `dr` is 0 the edge is
+    traversed clockwise around the tile, otherwise counter-clockwise.
+    """
+    cw_ind = SIDE_CLOCKWISE_INDEX[side]
+    verts = SHAPE_VERTEXES[shape]
+    return verts[(cw_ind + 1 - dr) & 0x3], verts[(cw_ind + dr) & 0x3]
+
+
+def _cap_probes(
+    shape: TileShape, side: TileSide, dr: int
+) -> Tuple[Tuple[int, int, Tuple[int, int]], ...]:
+    """Gets the neighbors to search for a joining edge when computing the cap
+    of the given edge orientation.
+
+    Returns:
+        A tuple of (dx, dy, join_vert) entries in search order where
+        `join_vert` is the start vertex, in the neighbor's coordinates, a
+        joining edge would need. Empty if the edge ends between tile corners
+        and so can never have a cap.
+    """
+    _, vert_b = _edge_vertexes(shape, side, dr)
+    ddirs: Tuple[Tuple[int, int], ...] = ()
+    if vert_b == (0, 0):
+        ddirs = ((-1, 0), (-1, -1), (0, -1))
+    elif vert_b == (2, 0):
+        ddirs = ((0, -1), (1, -1), (1, 0))
+    elif vert_b == (2, 2):
+        ddirs = ((1, 0), (1, 1), (0, 1))
+    elif vert_b == (0, 2):
+        ddirs = ((0, 1), (-1, 1), (-1, 0))
+    if dr:
+        ddirs = ddirs[::-1]
+    return tuple((dx, dy, (vert_b[0] - dx * 2, vert_b[1] - dy * 2)) for dx, dy in ddirs)
+
+
+#: Precomputed :func:`_edge_vertexes` results indexed by [shape][side][dr].
+_EDGE_VERTEXES = tuple(
+    tuple(
+        tuple(_edge_vertexes(shape, side, dr) for dr in range(2)) for side in TileSide
+    )
+    for shape in TileShape
+)
+
+#: Precomputed :func:`_cap_probes` results indexed by [shape][side][dr].
+_CAP_PROBES = tuple(
+    tuple(tuple(_cap_probes(shape, side, dr) for dr in range(2)) for side in TileSide)
+    for shape in TileShape
+)
+
+
 class _LateBoundDescriptor:
     """Utility class to late bind a property descriptor to an instance"""
 
@@ -56,14 +149,32 @@ class _LateBoundDescriptor:
         return getattr(obj, self.attrname).__delete__(obj)
 
 
+def _player_position_props(player: int) -> Tuple[property, property]:
+    """Create the x and y variable accessors for a player's start position."""
+    return (
+        bind_prop(f"p{player}_x", VariableInt, 0),
+        bind_prop(f"p{player}_y", VariableInt, 0),
+    )
+
+
+#: Shared start position accessors for each of the four players.
+_PLAYER_POSITION_PROPS = {
+    player: _player_position_props(player) for player in range(1, 5)
+}
+
+
 class PlayerPosition:
     """Used internally to manage player position accessors. Meant to be used
     through accesss to :meth:`Level.start_position`."""
 
+    __slots__ = ("variables", "_x", "_y")
+
     def __init__(self, variables: Dict[str, Variable], player: int):
         self.variables = variables
-        self._x = bind_prop(f"p{player}_x", VariableInt, 0)
-        self._y = bind_prop(f"p{player}_y", VariableInt, 0)
+        props = _PLAYER_POSITION_PROPS.get(player)
+        if props is None:
+            props = _player_position_props(player)
+        self._x, self._y = props
 
     x = _LateBoundDescriptor("_x", "int: Player start x-coordinate in pixels")
     y = _LateBoundDescriptor("_y", "int: Player start y-coordinate in pixels")
@@ -108,20 +219,25 @@ class Level:
         )
         self.dustmod_version = b"dustmaker"
 
+    def _root(self) -> "Level":
+        """Returns the top-level level that owns the ID space."""
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        return root
+
     def _gen_id(self) -> int:
         """Allocate and return an ID for a new entity or prop."""
-        if self.parent is not None:
-            return self.parent._gen_id()
-        result = self._next_id
-        self._next_id += 1
+        root = self._root()
+        result = root._next_id
+        root._next_id += 1
         return result
 
     def _note_id(self, id_num: int) -> None:
         """Called to update the internally tracked minimum ID."""
-        if self.parent is not None:
-            self.parent._note_id(id_num)
-        else:
-            self._next_id = max(self._next_id, id_num + 1)
+        root = self._root()
+        if id_num >= root._next_id:
+            root._next_id = id_num + 1
 
     name = bind_prop("level_name", VariableString, b"")
     virtual_character = bind_prop("vector_character", VariableBool, False)
@@ -227,18 +343,23 @@ class Level:
         """
         self._next_id = min_id
 
-        prop_remap = {id_num: self._gen_id() for id_num in self.props}
-        self.props = {prop_remap[id_num]: prop for id_num, prop in self.props.items()}
+        # IDs are handed out contiguously so allocate them all at once.
+        root = self._root()
+        base = root._next_id
+        self.props = dict(zip(range(base, base + len(self.props)), self.props.values()))
+        base += len(self.props)
+
+        # Entities need the old -> new mapping to fix up internal references.
+        entity_remap = dict(zip(self.entities, range(base, base + len(self.entities))))
+        self.entities = dict(zip(entity_remap.values(), self.entities.values()))
+        root._next_id = base + len(self.entities)
 
-        entity_remap = {id_num: self._gen_id() for id_num in self.entities}
-        self.entities = {
-            entity_remap[id_num]: entity for id_num, entity in self.entities.items()
-        }
         for _, _, entity in self.entities.values():
             entity.remap_ids(entity_remap)
 
-        if self.backdrop is not None:
-            self.backdrop.remap_ids()
+        backdrop = self.backdrop
+        if backdrop is not None and (backdrop.props or backdrop.entities):
+            backdrop.remap_ids()
 
     def calculate_max_id(self, reset: bool = True) -> int:
         """Calculates the maximum prop or entity ID currently in use. This will
@@ -251,16 +372,16 @@ class Level:
                 ID will be at least one less than the next ID.
         """
         init = 100 if reset else self._next_id - 1
-
-        # pylint: disable=nested-min-max
-        mx_id = max(max(self.props, default=init), max(self.entities, default=init))
+        mx_id = max(itertools.chain(self.props, self.entities, (init,)))
 
         if self.backdrop is not None:
             mx_id = max(mx_id, self.backdrop.calculate_max_id())
         self._next_id = mx_id + 1
         return mx_id
 
-    def merge(self, other_level: "Level", remap_ids: bool = True) -> None:
+    def merge(
+        self, other_level: "Level", remap_ids: bool = True, deep: bool = True
+    ) -> None:
         """Merge another level into this one.
 
         Args:
@@ -268,15 +389,37 @@ class Level:
             remap_ids (bool, optional): Wether to remap the ID space of each
                 level so they do not interfere with each other. This is True by
                 default.
+            deep (bool, optional): Wether to copy the tiles, props, and entities
+                of `other_level`. If False the objects are shared between both
+                levels which is faster but only safe if `other_level` will no
+                longer be used. This is True by default.
         """
         if remap_ids:
             self.remap_ids(other_level.calculate_max_id() + 1)
 
-        self.tiles.update(copy.deepcopy(other_level.tiles))
-        self.props.update(copy.deepcopy(other_level.props))
-        self.entities.update(copy.deepcopy(other_level.entities))
+        if deep:
+            self.tiles.update(
+                {key: tile.clone() for key, tile in other_level.tiles.items()}
+            )
+            self.props.update(
+                {
+                    id_num: (layer, x, y, prop.clone())
+                    for id_num, (layer, x, y, prop) in other_level.props.items()
+                }
+            )
+            self.entities.update(
+                {
+                    id_num: (x, y, entity.clone())
+                    for id_num, (x, y, entity) in other_level.entities.items()
+                }
+            )
+        else:
+            self.tiles.update(other_level.tiles)
+            self.props.update(other_level.props)
+            self.entities.update(other_level.entities)
+
         if self.backdrop is not None and other_level.backdrop is not None:
-            self.backdrop.merge(other_level.backdrop, remap_ids=False)
+            self.backdrop.merge(other_level.backdrop, remap_ids=False, deep=deep)
 
     def transform(self, mat: TxMatrix) -> None:
         """Transforms the level with the given affine transformation matrix.  Note
@@ -299,36 +442,83 @@ class Level:
             script persist data.
         """
 
-        def _transform_tiles():
+        # Unpack the affine coefficients once rather than calling mat.sample
+        # for each tile, prop, and entity.
+        (mxx, mxy, mox), (myx, myy, moy), _ = mat
+
+        tile_coefs = (mxx, mxy, myx, myy, mox / 48.0, moy / 48.0)
+        if all(float(coef).is_integer() for coef in tile_coefs):
+            # Translations, flips, rotations, and integer scales by whole
+            # tiles map the tile grid onto itself so tile positions can be
+            # computed exactly with integer math.
+            ixx, ixy, iyx, iyy, iox, ioy = (int(coef) for coef in tile_coefs)
+            if (ixx, ixy, iyx, iyy) != (1, 0, 0, 1):
+                for tile in self.tiles.values():
+                    tile.transform(mat)
+            else:
+                # Pure translations leave tiles alone apart from the edge
+                # cleanup tile.transform would do, which is much cheaper.
+                for tile in self.tiles.values():
+                    tile._reset_missing_edges()
+            self.tiles = {
+                (layer, ixx * x + ixy * y + iox, iyx * x + iyy * y + ioy): tile
+                for (layer, x, y), tile in self.tiles.items()
+            }
+        else:
+            # Round half up rather than to even so that tiles shifted by half a
+            # tile stay evenly spaced instead of colliding.
+            floor = math.floor
+            tox = mox / 48.0 + 0.5
+            toy = moy / 48.0 + 0.5
+            tiles = {}
             for (layer, x, y), tile in self.tiles.items():
                 tile.transform(mat)
-                tx, ty = mat.sample(x * 48, y * 48)
-
-                yield (layer, int(round(tx / 48.0)), int(round(ty / 48.0))), tile
-
-        def _transform_props():
-            for id_num, (layer, x, y, prop) in self.props.items():
-                prop.transform(mat)
-                tx, ty = mat.sample(x, y)
-                yield id_num, (layer, tx, ty, prop)
-
-        def _transform_entities():
-            for id_num, (x, y, entity) in self.entities.items():
-                entity.transform(mat)
-                tx, ty = mat.sample(x, y)
-                yield id_num, (tx, ty, entity)
-
-        self.tiles = dict(_transform_tiles())
-        self.props = dict(_transform_props())
-        self.entities = dict(_transform_entities())
-
+                tx = floor(mxx * x + mxy * y + tox)
+                ty = floor(myx * x + myy * y + toy)
+                tiles[(layer, tx, ty)] = tile
+            self.tiles = tiles
+
+        # Prop and entity IDs are unchanged by a transform so their mappings
+        # can be updated in place.
+        props = self.props
+        Prop.transform_batch((prop for _, _, _, prop in props.values()), mat)
+        for id_num, (layer, px, py, prop) in props.items():
+            props[id_num] = (
+                layer,
+                mxx * px + mxy * py + mox,
+                myx * px + myy * py + moy,
+                prop,
+            )
+
+        entities = self.entities
+        for id_num, (ex, ey, entity) in entities.items():
+            entity.transform(mat)
+            entities[id_num] = (
+                mxx * ex + mxy * ey + mox,
+                myx * ex + myy * ey + moy,
+                entity,
+            )
+
+        # Missing start positions default to the origin so they only need to
+        # be written out if the origin moves.
+        origin_fixed = int(round(mox)) == 0 and int(round(moy)) == 0
         for player in range(1, 5):
+            if (
+                origin_fixed
+                and f"p{player}_x" not in self.variables
+                and f"p{player}_y" not in self.variables
+            ):
+                continue
             pos = self.start_position(player)
             pos_tx, pos_ty = mat.sample(pos.x, pos.y)
             pos.x, pos.y = int(round(pos_tx)), int(round(pos_ty))
 
-        if self.backdrop is not None:
-            self.backdrop.transform(mat)
+        # Skip the recursion entirely for the common case of an empty backdrop.
+        backdrop = self.backdrop
+        if backdrop is not None and (
+            backdrop.tiles or backdrop.props or backdrop.entities
+        ):
+            backdrop.transform(mat)
 
     def flip_horizontal(self) -> None:
         """Flips the level horizontally. This is a convenience function around
@@ -362,11 +552,22 @@ class Level:
                 to :meth:`transform` along with the upscaling.
         """
         self.transform(mat * factor)
-        self.tiles = {
-            (layer, x + dx, y + dy): ntile
-            for (layer, x, y), tile in self.tiles.items()
-            for dx, dy, ntile in tile.upscale(factor)
-        }
+
+        # Levels tend to repeat the same few tiles so only upscale each
+        # distinct tile once and hand out clones for any repeats.
+        upscaled: Dict[Tuple, List[Tuple[int, int, Tile]]] = {}
+        tiles: Dict[Tuple[int, int, int], Tile] = {}
+        for (layer, x, y), tile in self.tiles.items():
+            key = tile._key()
+            parts = upscaled.get(key)
+            if parts is None:
+                parts = upscaled[key] = list(tile.upscale(factor))
+                for dx, dy, ntile in parts:
+                    tiles[(layer, x + dx, y + dy)] = ntile
+            else:
+                for dx, dy, ntile in parts:
+                    tiles[(layer, x + dx, y + dy)] = ntile.clone()
+        self.tiles = tiles
 
     def calculate_edge_visibility(
         self,
@@ -401,53 +602,41 @@ class Level:
         """
         neighbor_dir = ((0, -1), (0, 1), (-1, 0), (1, 0))
 
-        @functools.lru_cache(maxsize=None)
-        def _check_edge(shape: TileShape, side: TileSide) -> Tuple[bool, bool]:
-            """Gets properties of a given edge for a given shape.
-
-            Returns:
-                (exists: bool, flush: bool)
-            """
-            ind = SIDE_CLOCKWISE_INDEX[side]
-            vert_a = SHAPE_VERTEXES[shape][ind]
-            vert_b = SHAPE_VERTEXES[shape][(ind + 1) & 0x3]
-
-            if abs(vert_a[0] - vert_b[0]) + abs(vert_a[1] - vert_b[1]) <= 1:
-                return False, False
-            return True, vert_a[0] == vert_b[0] or vert_a[1] == vert_b[1]
+        # Bind frequently accessed globals and attributes to locals.
+        edge_properties = _EDGE_PROPERTIES
+        tiles_get = self.tiles.get
+        sides = tuple(TileSide)
 
         for (layer, x, y), tile in self.tiles.items():
-            for side in TileSide:
-                edge_exists, edge_flush = _check_edge(tile.shape, side)
+            tile_edge_data = tile.edge_data
+            shape_edges = edge_properties[tile.shape]
+            for side in sides:
+                edge_exists, edge_flush = shape_edges[side]
 
                 if not edge_exists:
-                    tile.edge_data[side] = TileEdgeData()
+                    tile_edge_data[side].reset()
                     continue
 
-                edat = tile.edge_data[side]
+                edat = tile_edge_data[side]
                 if not edge_flush:
                     edat.solid = edat.visible = True
                     continue
 
                 # Flush edge, check if neighbor is flush too
-                ndir = neighbor_dir[side]
-                ntile = self.tiles.get((layer, x + ndir[0], y + ndir[1]))
+                ndx, ndy = neighbor_dir[side]
+                ntile = tiles_get((layer, x + ndx, y + ndy))
 
                 if ntile is None:
                     edat.solid = edat.visible = True
                     continue
 
-                nedge_exists, nedge_flush = _check_edge(ntile.shape, side ^ 1)
+                nedge_exists, nedge_flush = edge_properties[ntile.shape][side ^ 1]
                 if not nedge_exists or not nedge_flush:
                     edat.solid = edat.visible = True
                     continue
 
                 edat.solid = False
-                if (tile.sprite_set, tile.sprite_tile, tile.sprite_palette) == (
-                    ntile.sprite_set,
-                    ntile.sprite_tile,
-                    ntile.sprite_palette,
-                ):
+                if ntile._sprite == tile._sprite:
                     edat.visible = False
                 elif visible_callback is None:
                     edat.visible = side in (TileSide.BOTTOM, TileSide.RIGHT)
@@ -493,8 +682,18 @@ class Level:
         True and filth angle to 0. Otherwise the filth cap should be False and
         the filth angle should match the edge angle.
         """
+        # Bind frequently accessed globals and attributes to locals.
+        edge_vertexes = _EDGE_VERTEXES
+        cap_probes = _CAP_PROBES
+        join_angles = _JOIN_ANGLES
+        tiles_get = self.tiles.get
+        sides = tuple(TileSide)
+
         for (layer, x, y), tile in self.tiles.items():
-            for side, edge_data in zip(TileSide, tile.edge_data):
+            tile_sprite = tile._sprite
+            tile_edge_vertexes = edge_vertexes[tile.shape]
+            tile_cap_probes = cap_probes[tile.shape]
+            for side, edge_data in zip(sides, tile.edge_data):
                 if not edge_data.visible:
                     # Clear all invalid data for invisible tiles.
                     edge_data.caps = (False, False)
@@ -512,42 +711,22 @@ class Level:
                 filth_angles = [0, 0]
 
                 for dr in range(2):
-                    cw_ind = SIDE_CLOCKWISE_INDEX[side]
-                    vert_a = SHAPE_VERTEXES[tile.shape][(cw_ind + 1 - dr) & 0x3]
-                    vert_b = SHAPE_VERTEXES[tile.shape][(cw_ind + dr) & 0x3]
-
-                    ddirs: Tuple[Tuple[int, int], ...] = ()
-                    if vert_b == (0, 0):
-                        ddirs = ((-1, 0), (-1, -1), (0, -1))
-                    elif vert_b == (2, 0):
-                        ddirs = ((0, -1), (1, -1), (1, 0))
-                    elif vert_b == (2, 2):
-                        ddirs = ((1, 0), (1, 1), (0, 1))
-                    elif vert_b == (0, 2):
-                        ddirs = ((0, 1), (-1, 1), (-1, 0))
-                    else:  # Slants
+                    probes = tile_cap_probes[side][dr]
+                    if not probes:
                         # No caps allowed on slant half edges
                         continue
-                    if dr:
-                        ddirs = ddirs[::-1]
-
-                    for dx, dy in ddirs:
-                        ntile = self.tiles.get((layer, x + dx, y + dy))
-                        if (
-                            ntile is None
-                            or tile.get_sprite_tuple() != ntile.get_sprite_tuple()
-                        ):
+
+                    for dx, dy, join_vert in probes:
+                        ntile = tiles_get((layer, x + dx, y + dy))
+                        if ntile is None or ntile._sprite != tile_sprite:
                             continue
 
                         nedge_data = ntile.edge_data[side]
                         if not nedge_data.visible:
                             continue
 
-                        nvert_a = SHAPE_VERTEXES[ntile.shape][(cw_ind + 1 - dr) & 0x3]
-                        nvert_b = SHAPE_VERTEXES[ntile.shape][(cw_ind + dr) & 0x3]
-                        nvert_a = (nvert_a[0] + dx * 2, nvert_a[1] + dy * 2)
-                        nvert_b = (nvert_b[0] + dx * 2, nvert_b[1] + dy * 2)
-                        if vert_b == nvert_a:
+                        nvert_a, nvert_b = edge_vertexes[ntile.shape][side][dr]
+                        if nvert_a == join_vert:
                             break
                     else:
                         # No joiner
@@ -557,14 +736,15 @@ class Level:
                         filth_angles[dr] = 0
                         continue
 
-                    delta_angle = (
-                        math.atan2(vert_b[1] - vert_a[1], vert_b[0] - vert_a[0])
-                        - math.atan2(nvert_b[1] - nvert_a[1], nvert_b[0] - nvert_a[0])
-                    ) % (2 * math.pi)
-                    if delta_angle > math.pi:
-                        delta_angle -= 2 * math.pi
-
-                    angle = -int(round(delta_angle * 180 / math.pi / 2))
+                    vert_a, vert_b = tile_edge_vertexes[side][dr]
+                    angle = join_angles[
+                        (
+                            vert_b[0] - vert_a[0],
+                            vert_b[1] - vert_a[1],
+                            nvert_b[0] - nvert_a[0],
+                            nvert_b[1] - nvert_a[1],
+                        )
+                    ]
 
                     # Set caps and angles based on joiner
                     caps[dr] = False
@@ -1,8 +1,9 @@
 """ Module containing dustmaker's prop representation.  """
 
-import math
+import copy
+from typing import Iterable
 
-from .transform import TxMatrix
+from .transform import _ANGLE_TO_U16, TxMatrix
 
 
 class Prop:
@@ -53,12 +54,33 @@ class Prop:
         self.prop_index = prop_index
         self.palette = palette
 
+    def clone(self) -> "Prop":
+        """Returns a copy of this prop. All prop attributes are immutable so
+        a shallow copy is sufficient.
+        """
+        return copy.copy(self)
+
     def transform(self, mat: TxMatrix) -> None:
         """
         Performs the requested transformation on the prop's :attr:`rotation` and
         :attr:`flip_y` attributes.
         """
-        self.rotation = self.rotation - int(0x10000 * mat.angle / math.pi / 2) & 0xFFFF
+        self.rotation = self.rotation - int(mat.angle * _ANGLE_TO_U16) & 0xFFFF
         if mat.flipped:
             self.flip_y = not self.flip_y
             self.rotation = -self.rotation & 0xFFFF
+
+    @staticmethod
+    def transform_batch(props: Iterable["Prop"], mat: TxMatrix) -> None:
+        """
+        Equivalent to calling :meth:`transform` on each prop in `props` but
+        only derives the rotation and flip from `mat` once.
+        """
+        delta = int(mat.angle * _ANGLE_TO_U16)
+        if mat.flipped:
+            for prop in props:
+                prop.flip_y = not prop.flip_y
+                prop.rotation = delta - prop.rotation & 0xFFFF
+        else:
+            for prop in props:
+                prop.rotation = prop.rotation - delta & 0xFFFF
@@ -3,12 +3,19 @@ Module defining the replay container types
 """
 
 import dataclasses
+import sys
 from enum import IntEnum, IntFlag
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 #: Latest replay version supported by dustmaker/dustmod
 LATEST_VERSION = 4
 
+#: Extra dataclass options for the replay containers. Slotted dataclasses
+#: are only available from Python 3.10.
+_DATACLASS_OPTIONS: Dict[str, Any] = (
+    {"slots": True} if sys.version_info >= (3, 10) else {}
+)
+
 
 class IntentStream(IntEnum):
     """Enumeration of the different intent streams in the order they
@@ -78,7 +85,7 @@ class Character(IntEnum):
     DUSTWRAITH = 7
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(**_DATACLASS_OPTIONS)
 class _IntentMetadata:
     """Container class for metadata about an intent stream"""
 
@@ -87,6 +94,16 @@ class _IntentMetadata:
     to_repr: Callable[[int], Any] = lambda x: x
     to_bits: Callable[[Any], int] = lambda x: x
     default: Any = 0
+    #: Precomputed `to_repr` results for every encoding of narrow intents.
+    repr_table: Optional[Tuple[Any, ...]] = dataclasses.field(init=False, default=None)
+    #: Precomputed `to_bits` results keyed by the representation of each
+    #: encoding of narrow intents.
+    bits_table: Optional[Dict[Any, int]] = dataclasses.field(init=False, default=None)
+
+    def __post_init__(self) -> None:
+        if self.bits <= 8:
+            self.repr_table = tuple(self.to_repr(x) for x in range(1 << self.bits))
+            self.bits_table = {rep: self.to_bits(rep) for rep in self.repr_table}
 
 
 _INTENT_META = (
@@ -112,14 +129,14 @@ _INTENT_META = (
     _IntentMetadata(
         bits=16,
         to_repr=lambda x: x / 32767.0,
-        to_bits=lambda x: int(round(x * 32767)),
+        to_bits=lambda x: round(x * 32767),
         version=4,
         default=0.0,
     ),  # MOUSE_X
     _IntentMetadata(
         bits=16,
         to_repr=lambda x: x / 32767.0,
-        to_bits=lambda x: int(round(x * 32767)),
+        to_bits=lambda x: round(x * 32767),
         version=4,
         default=0.0,
     ),  # MOUSE_Y
@@ -132,8 +149,11 @@ _INTENT_META = (
     ),  # MOUSE_STATE
 )
 
+#: Neutral value of each intent stream indexed by :class:`IntentStream`.
+_INTENT_DEFAULTS = tuple(intent_meta.default for intent_meta in _INTENT_META)
+
 
-@dataclasses.dataclass
+@dataclasses.dataclass(**_DATACLASS_OPTIONS)
 class PlayerData:
     """Container class for a single player's replay data"""
 
@@ -149,11 +169,11 @@ class PlayerData:
         """Returns the value for the given intent at the given frame"""
         values = self.intents.get(intent)
         if values is None or not (0 <= frame < len(values)):
-            return _INTENT_META[intent].default
+            return _INTENT_DEFAULTS[intent]
         return values[frame]
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(**_DATACLASS_OPTIONS)
 class EntityFrame:
     """Container class for a single frame worth of entity desync data."""
 
@@ -169,7 +189,7 @@ class EntityFrame:
     y_speed: float = 0.0
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(**_DATACLASS_OPTIONS)
 class EntityData:
     """Container class for all the desync frame data for an entity. Note that
     the engine only stores desync data every 8 frames (and then slower than that
@@ -181,8 +201,29 @@ class EntityData:
     #: of frame time but the times might not increase at the same rate.
     frames: List[EntityFrame] = dataclasses.field(default_factory=list)
 
+    def get_frame(self, frame: int) -> Optional[EntityFrame]:
+        """Get the most recent desync frame recorded at or before `frame`
+        using a binary search over :attr:`frames`.
 
-@dataclasses.dataclass
+        Args:
+            frame (int): The frame time to look up
+
+        Returns:
+            The matching :class:`EntityFrame` or None if every recorded frame
+            comes after `frame`.
+        """
+        frames = self.frames
+        lo, hi = 0, len(frames)
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if frames[mid].frame <= frame:
+                lo = mid + 1
+            else:
+                hi = mid
+        return frames[lo - 1] if lo else None
+
+
+@dataclasses.dataclass(**_DATACLASS_OPTIONS)
 class Replay:
     """Container class for a replay"""
 
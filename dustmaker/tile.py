@@ -2,14 +2,22 @@
 Module defining the tile respresentation in dustmaker.
 """
 
-import copy
-import math
+import functools
+import struct
+import sys
 from dataclasses import dataclass
 from enum import IntEnum
-from typing import Generator, Optional, Tuple
+from typing import Any, Dict, Generator, List, Optional, Tuple
 
+from .exceptions import LevelParseException
 from .transform import TxMatrix
 
+#: Tiles hold one TileEdgeData per side so drop the per-instance __dict__
+#: where dataclasses support it (Python 3.10+).
+_EDGE_DATACLASS_OPTIONS: Dict[str, Any] = (
+    {"slots": True} if sys.version_info >= (3, 10) else {}
+)
+
 
 class TileSpriteSet(IntEnum):
     """Used to describe what set of tiles a tile's sprite comes from."""
@@ -34,7 +42,7 @@ class TileSide(IntEnum):
     RIGHT = 3
 
 
-@dataclass
+@dataclass(**_EDGE_DATACLASS_OPTIONS)
 class TileEdgeData:
     """Data class for data stored on each tile edge. Many attributes are stored
     as pairs of data to correspond to the two corners of the tile edge. These
@@ -62,6 +70,32 @@ class TileEdgeData:
     #: Same as :attr:`angles` but for filth join angles.
     filth_angles: Tuple[int, int] = (0, 0)
 
+    def clone(self) -> "TileEdgeData":
+        """Returns a copy of this edge data. This is equivalent to but cheaper
+        than `copy.copy(edge)`.
+        """
+        return TileEdgeData(
+            self.solid,
+            self.visible,
+            self.caps,
+            self.angles,
+            self.filth_sprite_set,
+            self.filth_spike,
+            self.filth_caps,
+            self.filth_angles,
+        )
+
+    def reset(self) -> None:
+        """Resets all fields to their defaults in place."""
+        self.solid = False
+        self.visible = False
+        self.caps = (False, False)
+        self.angles = (0, 0)
+        self.filth_sprite_set = TileSpriteSet.NONE_0
+        self.filth_spike = False
+        self.filth_caps = (False, False)
+        self.filth_angles = (0, 0)
+
 
 class TileShape(IntEnum):
     """Tiles come in four main types; full, half, big, and small. Images of
@@ -114,6 +148,65 @@ class TileShape(IntEnum):
     HALF_D = 20
 
 
+#: Enum members indexed by value so that decoding can skip the enum
+#: constructor.
+_TILE_SPRITE_SETS = tuple(TileSpriteSet)
+_TILE_SHAPES = tuple(TileShape)
+
+
+#: Sides whose corner order in the binary tile format is the reverse of
+#: the clockwise order used by dustmaker, indexed by :class:`TileSide`.
+_IO_REVERSED_SIDES = (False, True, True, False)
+
+#: Layout of the eight signed edge angle bytes within tile and dust data.
+_EDGE_ANGLES_STRUCT = struct.Struct("<8b")
+
+#: Cap bits for the first and second corner of each side within a byte of
+#: packed edge caps, indexed by :class:`TileSide`.
+_EDGE_CAP_BITS = tuple(
+    (
+        (2 << 2 * side, 1 << 2 * side)
+        if _IO_REVERSED_SIDES[side]
+        else (1 << 2 * side, 2 << 2 * side)
+    )
+    for side in range(4)
+)
+
+#: (solid, visible) flags of each side indexed by the first byte of tile data.
+_UNPACK_EDGE_FLAGS = tuple(
+    tuple((bool(val & 1 << side), bool(val & 0x10 << side)) for side in range(4))
+    for val in range(256)
+)
+
+#: Caps of each side indexed by a byte of packed edge caps.
+_UNPACK_EDGE_CAPS = tuple(
+    tuple((bool(val & bit0), bool(val & bit1)) for bit0, bit1 in _EDGE_CAP_BITS)
+    for val in range(256)
+)
+
+#: (filth_sprite_set, filth_spike) of the two sides packed into a byte of
+#: dust data, low nibble first.
+_UNPACK_EDGE_FILTH = tuple(
+    tuple(
+        (_TILE_SPRITE_SETS[val >> shift & 0x7], bool(val >> shift & 0x8))
+        for shift in (0, 4)
+    )
+    for val in range(256)
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _sprite_path(sprite: Tuple[TileSpriteSet, int, int]) -> str:
+    """Formats :attr:`Tile.sprite_path` for a sprite tuple. Levels only use a
+    handful of distinct sprites so each path is only built once."""
+    sprite_set, sprite_tile, sprite_palette = sprite
+    return "area/{}/tiles/tile{}_{}_0001.png".format(
+        sprite_set.name.lower(),
+        sprite_tile,
+        sprite_palette + 1,
+    )
+
+
 class Tile:
     """Represents a single tile in a Dustforce level. Positional information
     (x, y, layer) is stored within the containing :class:`Level` and not in
@@ -136,14 +229,10 @@ class Tile:
             * Bit 3 - solid flag
         edge_data: List[TileEdgeData]: Edge data for each edge of the tile. This should always
             be a list of length 4 regardless of the tile :attr:`shape`.
-        sprite_set (TileSpriteSet): The sprite set this tile comes from. (e.g.
-            forest, mansion)
-        sprite_tile (int): The index of the specific tile within this sprite set (e.g.
-            grass, dirt). Check https://github.com/cmann1/PropUtils/tree/master/files/tiles_reference
-            for a visual reference to get sprite index information.
-        sprite_palette (int): The color variant of this tile.
     """
 
+    __slots__ = ("shape", "tile_flags", "edge_data", "_sprite")
+
     def __init__(
         self,
         shape: TileShape = TileShape.FULL,
@@ -157,10 +246,17 @@ class Tile:
     ) -> None:
         self.shape = shape
         self.tile_flags = tile_flags
-        self.edge_data = [TileEdgeData() for _ in TileSide]
-        self.sprite_set = sprite_set
-        self.sprite_tile = sprite_tile
-        self.sprite_palette = sprite_palette
+        self.edge_data = [
+            TileEdgeData(),
+            TileEdgeData(),
+            TileEdgeData(),
+            TileEdgeData(),
+        ]
+        self._sprite: Tuple[TileSpriteSet, int, int] = (
+            sprite_set,
+            sprite_tile,
+            sprite_palette,
+        )
 
         if _tile_data is not None:
             self._unpack_tile_data(_tile_data)
@@ -170,22 +266,99 @@ class Tile:
     def __eq__(self, oth):
         if not isinstance(oth, Tile):
             return False
-        return self._vals() == oth._vals()
+        return (
+            self.shape == oth.shape
+            and self.tile_flags == oth.tile_flags
+            and self._sprite == oth._sprite
+            and self.edge_data == oth.edge_data
+        )
 
     def __hash__(self):
-        return hash(self._vals())
+        return hash(self._key())
 
-    def _vals(self):
-        """Values used for __eq__ and __hash__"""
+    def _key(self) -> Tuple:
+        """Hashable snapshot of all of the tile's data."""
         return (
             self.shape,
             self.tile_flags,
-            self.edge_data,
-            self.sprite_set,
-            self.sprite_tile,
-            self.sprite_palette,
+            self._sprite,
+            tuple(
+                (
+                    edge.solid,
+                    edge.visible,
+                    edge.caps,
+                    edge.angles,
+                    edge.filth_sprite_set,
+                    edge.filth_spike,
+                    edge.filth_caps,
+                    edge.filth_angles,
+                )
+                for edge in self.edge_data
+            ),
         )
 
+    def clone(self) -> "Tile":
+        """Returns a copy of this tile. This is equivalent to but considerably
+        cheaper than `copy.deepcopy(tile)`.
+        """
+        result = Tile.__new__(Tile)
+        result.shape = self.shape
+        result.tile_flags = self.tile_flags
+        result.edge_data = [edge.clone() for edge in self.edge_data]
+        result._sprite = self._sprite
+        return result
+
+    @classmethod
+    def _fast_new(
+        cls, shape: TileShape, sprite: Tuple[TileSpriteSet, int, int]
+    ) -> "Tile":
+        """Equivalent to `Tile(shape)` followed by :meth:`set_sprite_tuple`
+        without the argument handling. Used by :meth:`upscale`.
+        """
+        result = cls.__new__(cls)
+        result.shape = shape
+        result.tile_flags = 0x4
+        result.edge_data = [
+            TileEdgeData(),
+            TileEdgeData(),
+            TileEdgeData(),
+            TileEdgeData(),
+        ]
+        result._sprite = sprite
+        return result
+
+    @property
+    def sprite_set(self) -> TileSpriteSet:
+        """TileSpriteSet: The sprite set this tile comes from. (e.g. forest,
+        mansion)
+        """
+        return self._sprite[0]
+
+    @sprite_set.setter
+    def sprite_set(self, sprite_set: TileSpriteSet) -> None:
+        self._sprite = (sprite_set, self._sprite[1], self._sprite[2])
+
+    @property
+    def sprite_tile(self) -> int:
+        """int: The index of the specific tile within this sprite set (e.g.
+        grass, dirt). Check https://github.com/cmann1/PropUtils/tree/master/files/tiles_reference
+        for a visual reference to get sprite index information.
+        """
+        return self._sprite[1]
+
+    @sprite_tile.setter
+    def sprite_tile(self, sprite_tile: int) -> None:
+        self._sprite = (self._sprite[0], sprite_tile, self._sprite[2])
+
+    @property
+    def sprite_palette(self) -> int:
+        """int: The color variant of this tile."""
+        return self._sprite[2]
+
+    @sprite_palette.setter
+    def sprite_palette(self, sprite_palette: int) -> None:
+        self._sprite = (self._sprite[0], self._sprite[1], sprite_palette)
+
     def get_sprite_tuple(self) -> Tuple[TileSpriteSet, int, int]:
         """Convenience method for getting a tuple that describes the sprite
         of a tile for easy sprite comparison and copying.
@@ -193,7 +366,7 @@ class Tile:
         Returns:
             A three-tuple containing the sprite set, tile, and palette of this tile.
         """
-        return self.sprite_set, self.sprite_tile, self.sprite_palette
+        return self._sprite
 
     def set_sprite_tuple(self, sprite_tuple: Tuple[TileSpriteSet, int, int]) -> None:
         """Convenience method for setting sprite information in the same format
@@ -203,7 +376,8 @@ class Tile:
             sprite_tuple (TileSpriteSet, int, int): Sprite set, tile, and palette
                 information.
         """
-        self.sprite_set, self.sprite_tile, self.sprite_palette = sprite_tuple
+        sprite_set, sprite_tile, sprite_palette = sprite_tuple
+        self._sprite = (sprite_set, sprite_tile, sprite_palette)
 
     @property
     def sprite_path(self) -> str:
@@ -211,16 +385,17 @@ class Tile:
         currently selected. You may retrieve the complete game sprites listing from
         https://www.dropbox.com/s/jm37ew9p74olgca/sprites.zip?dl=0
         """
-        return "area/{}/tiles/tile{}_{}_0001.png".format(
-            self.sprite_set.name.lower(),
-            self.sprite_tile,
-            self.sprite_palette + 1,
-        )
+        return _sprite_path(self._sprite)
 
     def has_filth(self) -> bool:
         """Returns true if there is filth attached to any edges of this tile"""
-        return any(
-            edge.filth_sprite_set != TileSpriteSet.NONE_0 for edge in self.edge_data
+        top, bottom, left, right = self.edge_data
+        none = TileSpriteSet.NONE_0
+        return (
+            top.filth_sprite_set != none
+            or bottom.filth_sprite_set != none
+            or left.filth_sprite_set != none
+            or right.filth_sprite_set != none
         )
 
     def is_dustblock(self) -> bool:
@@ -249,59 +424,35 @@ class Tile:
         Attributes:
             mat: The transformation matrix. See :meth:`dustmaker.level.Level.transform`
         """
-        oshape = self.shape
         flipped = mat.flipped
-        if flipped:
-            # horizontally flip
-            if self.shape == TileShape.FULL:
-                self.edge_data[TileSide.LEFT], self.edge_data[TileSide.RIGHT] = (
-                    self.edge_data[TileSide.RIGHT],
-                    self.edge_data[TileSide.LEFT],
-                )
-            elif self.shape <= TileShape.SMALL_8:
-                # No need to fix edge data order as SHAPE_ORDERED_SIDES uniquely
-                # maps the transformed sides to original sides.
-                self.shape = TileShape(1 + ((self.shape - TileShape.BIG_1) ^ 8) % 16)
-            else:
-                # Flipping swaps clockwise direction so we do the same.
-                s1 = SHAPE_ORDERED_SIDES[self.shape][1]
-                s2 = SHAPE_ORDERED_SIDES[self.shape][2]
-                self.edge_data[s1], self.edge_data[s2] = (
-                    self.edge_data[s2],
-                    self.edge_data[s1],
-                )
-                self.shape = TileShape(17 + ((self.shape - TileShape.HALF_A) ^ 3))
-
-            # flips swap clockwise to counterclockwise, reverse directed data
-            for edge in self.edge_data:
+        angle = _quarter_turns(mat, flipped)
+
+        shape, sources = _TRANSFORM_TABLE[(4 if flipped else 0) | angle][self.shape]
+        edge_data = self.edge_data
+        new_edge_data = []
+        for source in sources:
+            if source < 0:
+                new_edge_data.append(TileEdgeData())
+                continue
+            edge = edge_data[source]
+            if flipped:
+                # flips swap clockwise to counterclockwise, reverse directed data
                 edge.caps = edge.caps[::-1]
                 edge.filth_caps = edge.filth_caps[::-1]
                 edge.angles = (-edge.angles[1], -edge.angles[0])
                 edge.filth_angles = (-edge.filth_angles[1], -edge.filth_angles[0])
+            new_edge_data.append(edge)
 
-        angle = int(
-            round(
-                math.atan2(mat[1][1], (-1 if flipped else 1) * mat[1][0]) / math.pi * 2
-            )
-        )
-        angle = (-angle + 1) & 0x3
-
-        if self.shape == TileShape.FULL:
-            pass
-        elif self.shape <= TileShape.SMALL_4:
-            self.shape = TileShape(1 + ((self.shape - TileShape.BIG_1) + angle * 2) % 8)
-        elif self.shape <= TileShape.SMALL_8:
-            self.shape = TileShape(9 + ((self.shape - TileShape.BIG_5) - angle * 2) % 8)
-        else:
-            self.shape = TileShape(17 + ((self.shape - TileShape.HALF_A) + angle) % 4)
-
-        og_edge_data = [self.edge_data[side] for side in SHAPE_ORDERED_SIDES[oshape]]
-        self.edge_data = [TileEdgeData() for _ in TileSide]
+        self.shape = shape
+        self.edge_data = new_edge_data
 
-        for i, side in enumerate(SHAPE_ORDERED_SIDES[self.shape]):
-            if self.shape == TileShape.FULL:
-                i = (i - angle) & 3
-            self.edge_data[side] = og_edge_data[i]
+    def _reset_missing_edges(self) -> None:
+        """Resets the edge data of sides this tile's shape does not have. This
+        matches what :meth:`transform` does for an identity matrix.
+        """
+        edge_data = self.edge_data
+        for side in _MISSING_SIDES[self.shape]:
+            edge_data[side] = TileEdgeData()
 
     def upscale(self, factor: int) -> Generator[Tuple[int, int, "Tile"], None, None]:
         """
@@ -317,41 +468,49 @@ class Tile:
         if factor < 1:
             return
         if factor == 1:
-            yield 0, 0, copy.deepcopy(self)
+            yield 0, 0, self.clone()
             return
 
-        def _tuple_set(data: Tuple, ind: int, value) -> Tuple:
-            return tuple((value if i == ind else x) for i, x in enumerate(data))
+        sprite = self.get_sprite_tuple()
+
+        # Half-tile coordinates of the outer edges of the upscaled square.
+        boundary = (0, factor * 2)
 
         def _copy_side(dx: int, dy: int, tile: Tile, side: TileSide):
             """Copies a side from self into the upscaled tile. Adjust the
             caps if the edge does not leave the upscaled tile boundary.
             """
-            edge_data = copy.deepcopy(self.edge_data[side])
+            edge_data = self.edge_data[side].clone()
 
             cw_ind = SIDE_CLOCKWISE_INDEX[side]
+            verts = SHAPE_VERTEXES[tile.shape]
             for dr in range(2):
-                vert_a = SHAPE_VERTEXES[tile.shape][(cw_ind + 1 - dr) & 0x3]
-                vert_b = SHAPE_VERTEXES[tile.shape][(cw_ind + dr) & 0x3]
+                vert_a = verts[(cw_ind + 1 - dr) & 0x3]
+                vert_b = verts[(cw_ind + dr) & 0x3]
                 x = 2 * dx + vert_b[0]
                 y = 2 * dy + vert_b[1]
-                if vert_a[0] != vert_b[0] and x in (0, factor * 2):
+                if vert_a[0] != vert_b[0] and x in boundary:
                     continue
-                if vert_a[1] != vert_b[1] and y in (0, factor * 2):
+                if vert_a[1] != vert_b[1] and y in boundary:
                     continue
 
-                edge_data.caps = _tuple_set(edge_data.caps, dr, False)  # type: ignore
-                edge_data.angles = _tuple_set(edge_data.angles, dr, 0)  # type: ignore
-                edge_data.filth_caps = _tuple_set(edge_data.filth_caps, dr, False)  # type: ignore
-                edge_data.filth_angles = _tuple_set(edge_data.filth_angles, dr, 0)  # type: ignore
+                if dr == 0:
+                    edge_data.caps = (False, edge_data.caps[1])
+                    edge_data.angles = (0, edge_data.angles[1])
+                    edge_data.filth_caps = (False, edge_data.filth_caps[1])
+                    edge_data.filth_angles = (0, edge_data.filth_angles[1])
+                else:
+                    edge_data.caps = (edge_data.caps[0], False)
+                    edge_data.angles = (edge_data.angles[0], 0)
+                    edge_data.filth_caps = (edge_data.filth_caps[0], False)
+                    edge_data.filth_angles = (edge_data.filth_angles[0], 0)
 
             tile.edge_data[side] = edge_data
 
         if self.shape == TileShape.FULL:
             for dx in range(factor):
                 for dy in range(factor):
-                    tile = Tile(TileShape.FULL)
-                    tile.set_sprite_tuple(self.get_sprite_tuple())
+                    tile = Tile._fast_new(TileShape.FULL, sprite)
 
                     if dx == 0:
                         _copy_side(dx, dy, tile, TileSide.LEFT)
@@ -368,8 +527,7 @@ class Tile:
             for dx in range(factor):
                 ddx = dx + (factor if self.shape == TileShape.SMALL_1 else 0)
                 for dy in range(ddx // 2, factor):
-                    tile = Tile(TileShape.FULL)
-                    tile.set_sprite_tuple(self.get_sprite_tuple())
+                    tile = Tile._fast_new(TileShape.FULL, sprite)
 
                     if dy == ddx // 2:
                         tile.shape = TileShape.SMALL_1 if ddx % 2 else TileShape.BIG_1
@@ -384,8 +542,7 @@ class Tile:
         elif self.shape == TileShape.HALF_A:
             for dx in range(factor):
                 for dy in range(dx, factor):
-                    tile = Tile(TileShape.FULL)
-                    tile.set_sprite_tuple(self.get_sprite_tuple())
+                    tile = Tile._fast_new(TileShape.FULL, sprite)
 
                     if dx == dy:
                         tile.shape = TileShape.HALF_A
@@ -400,13 +557,13 @@ class Tile:
         else:
             # Otherwise transform the tile into one of the above handled cases
             # and transform the result back.
-            new_shape = self.shape
+            new_shape: TileShape = self.shape
 
             hflip = False
             if TileShape.BIG_5 <= new_shape <= TileShape.SMALL_8:
                 # horizontal flip
                 hflip = True
-                new_shape = TileShape(new_shape - 8)  # type: ignore
+                new_shape = _TILE_SHAPES[new_shape - 8]
 
             if TileShape.BIG_1 <= new_shape <= TileShape.SMALL_4:
                 rots = (new_shape - TileShape.BIG_1) // 2
@@ -431,7 +588,7 @@ class Tile:
             )
 
             # Copy tile and transform it.
-            ntile = copy.deepcopy(self)
+            ntile = self.clone()
             ntile.transform(mat)  # type: ignore
             assert ntile.shape in (TileShape.HALF_A, TileShape.BIG_1, TileShape.SMALL_1)
 
@@ -443,120 +600,107 @@ class Tile:
 
     def _pack_tile_data(self) -> bytes:
         """Pack the dustmaker respresentation back into the binary representation"""
-        tile_data = [0 for _ in range(12)]
+        flags = 0
+        cap_bits = 0
+        angles: List[int] = []
         for side, edge in enumerate(self.edge_data):
-            vals = [edge.solid, edge.visible, *edge.caps]
-            offsets = [0 + side, 4 + side, 8 + 2 * side, 9 + 2 * side]
-
-            if side in (TileSide.LEFT, TileSide.BOTTOM):
-                # Need to swap the edge bit order to match IO order
-                offsets[2], offsets[3] = offsets[3], offsets[2]
-
-            for val, off in zip(vals, offsets):
-                if val:
-                    tile_data[off >> 3] |= 1 << (off & 7)
+            if edge.solid:
+                flags |= 1 << side
+            if edge.visible:
+                flags |= 0x10 << side
+
+            cap0, cap1 = edge.caps
+            bit0, bit1 = _EDGE_CAP_BITS[side]
+            if cap0:
+                cap_bits |= bit0
+            if cap1:
+                cap_bits |= bit1
 
-            assert -0x80 <= edge.angles[0] <= 0x7F and -0x80 <= edge.angles[1] <= 0x7F
             v0, v1 = edge.angles
-            if side in (TileSide.LEFT, TileSide.BOTTOM):
+            assert -0x80 <= v0 <= 0x7F and -0x80 <= v1 <= 0x7F
+            if _IO_REVERSED_SIDES[side]:
                 v0, v1 = v1, v0
-            tile_data[2 + side * 2] = v0 & 0xFF
-            tile_data[3 + side * 2] = v1 & 0xFF
+            angles.append(v0 & 0xFF)
+            angles.append(v1 & 0xFF)
 
-        assert 0 <= self.sprite_set <= 0xF
-        assert 0 <= self.sprite_tile <= 0xFF
-        assert 0 <= self.sprite_palette <= 0xF
+        sprite_set, sprite_tile, sprite_palette = self._sprite
+        assert 0 <= sprite_set <= 0xF
+        assert 0 <= sprite_tile <= 0xFF
+        assert 0 <= sprite_palette <= 0xF
 
-        tile_data[10] = self.sprite_set + (self.sprite_palette << 4)
-        tile_data[11] = self.sprite_tile
-
-        return bytes(tile_data)
+        return bytes(
+            (flags, cap_bits, *angles, sprite_set + (sprite_palette << 4), sprite_tile)
+        )
 
     def _unpack_tile_data(self, tile_data: bytes) -> None:
         """Unpack tile data into the representation used by dustmaker."""
         assert len(tile_data) == 12
 
-        # Extract the edge bits
-        for side, edge in enumerate(self.edge_data):
+        sprite_set = tile_data[10] & 0xF
+        if sprite_set >= len(_TILE_SPRITE_SETS):
+            raise LevelParseException(f"unknown tile sprite set {sprite_set}")
 
-            def test_offset(off: int) -> bool:
-                return bool(tile_data[off >> 3] & (1 << (off & 7)))
-
-            edge.solid = test_offset(0 + side)
-            edge.visible = test_offset(4 + side)
-            edge.caps = (test_offset(8 + 2 * side), test_offset(9 + 2 * side))
-            if side in (TileSide.LEFT, TileSide.BOTTOM):
-                edge.caps = (edge.caps[1], edge.caps[0])
-
-            v0, v1 = tile_data[2 + side * 2], tile_data[3 + side * 2]
-            if v0 >= 0x80:
-                v0 -= 0x100
-            if v1 >= 0x80:
-                v1 -= 0x100
-            if side in (TileSide.LEFT, TileSide.BOTTOM):
-                v0, v1 = v1, v0
-            edge.angles = (v0, v1)
-
-        self.sprite_set = TileSpriteSet(tile_data[10] & 0xF)
-        self.sprite_tile = tile_data[11]
-        self.sprite_palette = tile_data[10] >> 4
+        # Corners of the bottom and left edges are stored in reverse order.
+        angles = _EDGE_ANGLES_STRUCT.unpack_from(tile_data, 2)
+        for edge, (solid, visible), caps, edge_angles in zip(
+            self.edge_data,
+            _UNPACK_EDGE_FLAGS[tile_data[0]],
+            _UNPACK_EDGE_CAPS[tile_data[1]],
+            (angles[0:2], angles[3:1:-1], angles[5:3:-1], angles[6:8]),
+        ):
+            edge.solid = solid
+            edge.visible = visible
+            edge.caps = caps
+            edge.angles = edge_angles
+
+        self._sprite = (
+            _TILE_SPRITE_SETS[sprite_set],
+            tile_data[11],
+            tile_data[10] >> 4,
+        )
 
     def _pack_dust_data(self) -> bytes:
         """Pack the dustmaker respresentation back into the binary representation"""
-        dust_data = [0 for _ in range(12)]
-
+        filth = 0
+        cap_bits = 0
+        angles: List[int] = []
         for side, edge in enumerate(self.edge_data):
-            sset, spike, caps, angles = (
-                edge.filth_sprite_set,
-                edge.filth_spike,
-                edge.filth_caps,
-                edge.filth_angles,
-            )
+            sset = edge.filth_sprite_set
             assert 0 <= sset <= 0xF
-            assert -0x80 <= angles[0] <= 0x7F
-            assert -0x80 <= angles[1] <= 0x7F
-
-            # Normalize for Dustforce binary format
-            if side in (TileSide.LEFT, TileSide.BOTTOM):
-                caps = caps[::-1]
-                angles = angles[::-1]
-
-            off = 4 * side
-            dust_data[off >> 3] |= (sset | (0x8 if spike else 0)) << (off & 0x7)
-            dust_data[2 + side * 2] = angles[0] & 0xFF
-            dust_data[3 + side * 2] = angles[1] & 0xFF
-            if caps[0]:
-                dust_data[10] |= 1 << (2 * side)
-            if caps[1]:
-                dust_data[10] |= 2 << (2 * side)
+            filth |= (sset | (0x8 if edge.filth_spike else 0)) << 4 * side
+
+            cap0, cap1 = edge.filth_caps
+            bit0, bit1 = _EDGE_CAP_BITS[side]
+            if cap0:
+                cap_bits |= bit0
+            if cap1:
+                cap_bits |= bit1
+
+            v0, v1 = edge.filth_angles
+            assert -0x80 <= v0 <= 0x7F and -0x80 <= v1 <= 0x7F
+            if _IO_REVERSED_SIDES[side]:
+                v0, v1 = v1, v0
+            angles.append(v0 & 0xFF)
+            angles.append(v1 & 0xFF)
 
-        return bytes(dust_data)
+        return bytes((filth & 0xFF, filth >> 8, *angles, cap_bits, 0))
 
     def _unpack_dust_data(self, dust_data: bytes) -> None:
         """Unpack dust data into the representation used by dustmaker."""
         assert len(dust_data) == 12
 
-        for side, edge in enumerate(self.edge_data):
-            off = 4 * side
-            val = dust_data[off >> 3] >> (off & 0x7)
-            edge.filth_sprite_set = TileSpriteSet(val & 0x7)
-            edge.filth_spike = bool(val & 0x8)
-            edge.filth_caps = (
-                bool((dust_data[10] >> (2 * side)) & 0x1),
-                bool((dust_data[10] >> (2 * side)) & 0x2),
-            )
-
-            v0, v1 = dust_data[2 + side * 2], dust_data[3 + side * 2]
-            if v0 >= 0x80:
-                v0 -= 0x100
-            if v1 >= 0x80:
-                v1 -= 0x100
-            edge.filth_angles = (v0, v1)
-
-            # Normalize for Dustforce binary format
-            if side in (TileSide.LEFT, TileSide.BOTTOM):
-                edge.filth_caps = edge.filth_caps[::-1]
-                edge.filth_angles = edge.filth_angles[::-1]
+        # Corners of the bottom and left edges are stored in reverse order.
+        angles = _EDGE_ANGLES_STRUCT.unpack_from(dust_data, 2)
+        for edge, (sprite_set, spike), caps, edge_angles in zip(
+            self.edge_data,
+            _UNPACK_EDGE_FILTH[dust_data[0]] + _UNPACK_EDGE_FILTH[dust_data[1]],
+            _UNPACK_EDGE_CAPS[dust_data[10]],
+            (angles[0:2], angles[3:1:-1], angles[5:3:-1], angles[6:8]),
+        ):
+            edge.filth_sprite_set = sprite_set
+            edge.filth_spike = spike
+            edge.filth_caps = caps
+            edge.filth_angles = edge_angles
 
 
 #: Mapping of :class:`TileSpriteSet` to the corresponding dustblock index
@@ -624,6 +768,82 @@ SHAPE_ORDERED_SIDES = tuple(
 )
 
 
+def _transform_entry(
+    shape: TileShape, flipped: bool, angle: int
+) -> Tuple[TileShape, Tuple[int, ...]]:
+    """Computes the effect of a flip and rotation on a tile of the given shape.
+    `angle` is the quarter turn count as decoded by :meth:`Tile.transform`.
+
+    Returns:
+        (new_shape, sources) where sources[side] is the original side whose
+        edge data moves to `side`, or -1 if `side` gets default edge data.
+    """
+    oshape = shape
+    sides = [0, 1, 2, 3]
+    if flipped:
+        # horizontally flip
+        if shape == TileShape.FULL:
+            sides[TileSide.LEFT], sides[TileSide.RIGHT] = (
+                sides[TileSide.RIGHT],
+                sides[TileSide.LEFT],
+            )
+        elif shape <= TileShape.SMALL_8:
+            # No need to fix edge data order as SHAPE_ORDERED_SIDES uniquely
+            # maps the transformed sides to original sides.
+            shape = TileShape(1 + ((shape - TileShape.BIG_1) ^ 8) % 16)
+        else:
+            # Flipping swaps clockwise direction so we do the same.
+            s1 = SHAPE_ORDERED_SIDES[shape][1]
+            s2 = SHAPE_ORDERED_SIDES[shape][2]
+            sides[s1], sides[s2] = sides[s2], sides[s1]
+            shape = TileShape(17 + ((shape - TileShape.HALF_A) ^ 3))
+
+    if shape == TileShape.FULL:
+        pass
+    elif shape <= TileShape.SMALL_4:
+        shape = TileShape(1 + ((shape - TileShape.BIG_1) + angle * 2) % 8)
+    elif shape <= TileShape.SMALL_8:
+        shape = TileShape(9 + ((shape - TileShape.BIG_5) - angle * 2) % 8)
+    else:
+        shape = TileShape(17 + ((shape - TileShape.HALF_A) + angle) % 4)
+
+    og_sides = [sides[side] for side in SHAPE_ORDERED_SIDES[oshape]]
+    sources = [-1, -1, -1, -1]
+    for i, side in enumerate(SHAPE_ORDERED_SIDES[shape]):
+        if shape == TileShape.FULL:
+            i = (i - angle) & 3
+        sources[side] = og_sides[i]
+    return shape, tuple(sources)
+
+
+#: Precomputed :func:`_transform_entry` results indexed by
+#: [(4 if flipped else 0) | angle][shape].
+_TRANSFORM_TABLE = tuple(
+    tuple(_transform_entry(shape, op >= 4, op & 3) for shape in TileShape)
+    for op in range(8)
+)
+
+
+#: Sides each :class:`TileShape` does not have, indexed by shape. Transforms
+#: reset the edge data of these sides.
+_MISSING_SIDES = tuple(
+    tuple(side for side, source in enumerate(sources) if source < 0)
+    for _, sources in _TRANSFORM_TABLE[0]
+)
+
+
+def _quarter_turns(mat: TxMatrix, flipped: bool) -> int:
+    """Decodes the rotation of a flip/rotation matrix as the quarter turn
+    count used by :data:`_TRANSFORM_TABLE`. Only the signs and relative
+    magnitudes of the second row matter so scaled matrices decode the same.
+    """
+    x = -mat[1][0] if flipped else mat[1][0]
+    y = mat[1][1]
+    if abs(y) > abs(x):
+        return 0 if y > 0 else 2
+    return 1 if x >= 0 else 3
+
+
 #: Mapping of :class:`TileShape` to the vertex coordinates of the tile in
 #: half-tile units. Vertexes are listed top-left, top-right, bottom-right,
 #: and bottom-left order.
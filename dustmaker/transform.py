@@ -1,12 +1,18 @@
 """ Module defining TxMatrix class used for affine transformations. """
 
+import functools
 import math
 from typing import Iterable, Tuple, Union
 
+#: Factor converting an angle in radians to the 16-bit rotation units used
+#: by props and entities.
+_ANGLE_TO_U16 = 0x10000 / (2 * math.pi)
+
 
 class TxMatrix(tuple):
     """Immutable transformation matrix. This is a subclass of tuple that
-    enforce itself to be a 3x3 affine transformation matrix.
+    enforce itself to be a 3x3 affine transformation matrix. Derived
+    properties like :attr:`angle` are computed once per matrix and cached.
     """
 
     IDENTITY: "TxMatrix"
@@ -36,25 +42,25 @@ class TxMatrix(tuple):
             )
         )
 
-    @property
+    @functools.cached_property
     def angle(self) -> float:
         """Returns the amount a vertical line has been rotated clockwise
         in radians under this transformation.
         """
         return math.atan2(self[1][1], self[1][0]) - math.pi / 2
 
-    @property
+    @functools.cached_property
     def determinant(self) -> float:
         """Get the determinant of the transformation matrix"""
         return self[0][0] * self[1][1] - self[0][1] * self[1][0]
 
-    @property
+    @functools.cached_property
     def flipped(self) -> bool:
         """Returns True if the transformation matrix flips an axis. This is the
         same as the :attr:`determinant` being negative."""
         return self.determinant < 0
 
-    @property
+    @functools.cached_property
     def scale(self) -> float:
         """Returns the scaling of the transformation matrix. This is just the
         square root of the absolute value of the determinant which itself
@@ -3,6 +3,7 @@ End to end tests for Dustmaker as a whole
 """
 
 import io
+import mmap
 import os
 import unittest
 
@@ -66,3 +67,34 @@ class TestEndToEnd(unittest.TestCase):
             data2 = writer.data.getvalue()
 
         self.assertEqual(data1, data2)
+
+    def test_read_replay_trailing_data(self):
+        """Test reading a replay without a known length leaves the stream
+        positioned just after the replay data"""
+        f_in = os.path.join(here, "downhill.dfreplay")
+
+        with open(f_in, "rb") as f:
+            data = bytes(f.read())
+
+        with DFReader(io.BytesIO(data)) as reader:
+            replay1 = reader.read_replay(known_length=len(data))
+
+        with DFReader(io.BytesIO(data + b"trailing")) as reader:
+            replay2 = reader.read_replay()
+            self.assertEqual(reader.read_bytes(8), b"trailing")
+
+        self.assertEqual(replay1, replay2)
+
+    def test_read_replay_mmap(self):
+        """Test reading a replay from a memory mapped file"""
+        f_in = os.path.join(here, "downhill.dfreplay")
+
+        with DFReader(open(f_in, "rb")) as reader:
+            replay1 = reader.read_replay()
+
+        with open(f_in, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                with DFReader(data, noclose=True) as reader:
+                    replay2 = reader.read_replay()
+
+        self.assertEqual(replay1, replay2)
@@ -5,8 +5,12 @@ Unit tests for IO routines
 import io
 import random
 import unittest
+import zlib
+from unittest import mock
 
-from dustmaker import DFReader, DFWriter
+from dustmaker import DFReader, DFWriter, Level
+from dustmaker.dfwriter import _compute_region_map
+from dustmaker.tile import Tile, TileShape
 from dustmaker.variable import (
     VariableArray,
     VariableBool,
@@ -107,3 +111,34 @@ class TestIOUnit(unittest.TestCase):
             variables_new = reader.read_variable(VariableType.STRUCT)
 
         self.assertEqual(variables, variables_new)
+
+    def test_region_inflated_length(self):
+        """A region header overstating its decompressed size does not size
+        zlib's output buffer beyond what the data could inflate to"""
+        level = Level()
+        for x in range(20):
+            level.tiles[(19, x, x // 2)] = Tile(TileShape.FULL)
+
+        (region_x, region_y), region = next(
+            iter(_compute_region_map(level).region_map.items())
+        )
+        with DFWriter(io.BytesIO()) as writer:
+            writer._write_region(region_x, region_y, region)
+            data = bytearray(writer.data.getvalue())
+        data[4:8] = (0xFFFFFFF0).to_bytes(4, "little")
+
+        bufsizes = []
+        decompress = zlib.decompress
+
+        def _decompress(compressed, bufsize):
+            bufsizes.append(bufsize)
+            return decompress(compressed, bufsize=bufsize)
+
+        rlevel = Level()
+        with mock.patch("dustmaker.dfreader.zlib.decompress", _decompress):
+            with DFReader(io.BytesIO(bytes(data))) as reader:
+                reader.read_region(rlevel)
+
+        self.assertEqual(1, len(bufsizes))
+        self.assertLessEqual(bufsizes[0], (len(data) - 17) * 1032)
+        self.assertEqual(level.tiles, rlevel.tiles)
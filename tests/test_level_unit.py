@@ -0,0 +1,108 @@
+"""
+Unit tests for the level module
+"""
+
+import pickle
+import unittest
+
+from dustmaker.entity import Entity
+from dustmaker.level import Level
+from dustmaker.prop import Prop
+from dustmaker.tile import Tile, TileEdgeData, TileShape, TileSide
+
+
+class TestLevelUnit(unittest.TestCase):
+    """
+    Unit tests for dustmaker levels
+    """
+
+    def test_translate_half_tile(self):
+        """Tiles translated by half a tile round half up and stay distinct"""
+        for dx, shift in ((24, 1), (-24, 0)):
+            level = Level()
+            tiles = {x: Tile(TileShape.FULL) for x in range(-4, 5)}
+            for x, tile in tiles.items():
+                level.tiles[(19, x, 3)] = tile
+
+            level.translate(dx, 0)
+
+            self.assertEqual(len(tiles), len(level.tiles))
+            for x, tile in tiles.items():
+                self.assertIs(tile, level.tiles[(19, x + shift, 3)])
+
+        level = Level()
+        level.tiles[(19, 3, 5)] = Tile(TileShape.FULL)
+        level.translate(0, 24)
+        self.assertEqual([(19, 3, 6)], list(level.tiles))
+
+    def test_translate_resets_missing_edges(self):
+        """Whole and fractional tile translations both reset edge data on
+        sides the tile shape does not have"""
+        for dx in (48, 24):
+            level = Level()
+            tile = Tile(TileShape.BIG_1)
+            tile.edge_data[TileSide.RIGHT] = TileEdgeData(solid=True, visible=True)
+            tile.edge_data[TileSide.TOP] = TileEdgeData(solid=True, visible=True)
+            level.tiles[(19, 2, 3)] = tile
+            level.translate(dx, 0)
+
+            self.assertEqual(TileEdgeData(), tile.edge_data[TileSide.RIGHT])
+            self.assertEqual(
+                TileEdgeData(solid=True, visible=True), tile.edge_data[TileSide.TOP]
+            )
+
+    def test_start_position(self):
+        """Start position accessors read and write the player variables"""
+        level = Level()
+        for player in range(1, 6):
+            pos = level.start_position(player)
+            self.assertEqual((0, 0), (pos.x, pos.y))
+            pos.x = 48 * player
+            pos.y = -player
+            self.assertEqual(48 * player, level.variables[f"p{player}_x"].value)
+            self.assertEqual(-player, level.variables[f"p{player}_y"].value)
+
+    def test_pickle_after_rotate(self):
+        """Levels can be pickled after transforms touch the start positions"""
+        level = Level()
+        level.tiles[(19, 2, 3)] = Tile(TileShape.BIG_1)
+        level.start_position(1).x = 96
+        level.start_position(2).y = 48
+        level.rotate(1)
+
+        plevel = pickle.loads(pickle.dumps(level))
+        self.assertEqual(level.tiles, plevel.tiles)
+        for player in range(1, 5):
+            pos = level.start_position(player)
+            ppos = plevel.start_position(player)
+            self.assertEqual((pos.x, pos.y), (ppos.x, ppos.y))
+
+    def test_gen_id_follows_parent(self):
+        """IDs are allocated from the current parent's ID space"""
+        level = Level()
+        other = Level()
+        other.remap_ids(500)
+
+        backdrop = level.backdrop
+        self.assertEqual(100, backdrop._gen_id())
+        backdrop.parent = other
+        self.assertEqual(500, backdrop._gen_id())
+        backdrop._note_id(700)
+        self.assertEqual(701, other._gen_id())
+        self.assertEqual(101, level._gen_id())
+
+    def test_calculate_max_id_floor(self):
+        """calculate_max_id never returns less than its floor, even when
+        both props and entities are present with lower IDs"""
+        prop = Prop(0, 0, False, False, 1.0, 1, 1, 1, 0)
+        level = Level()
+        level.props[5] = (19, 0.0, 0.0, prop)
+        level.entities[7] = (0.0, 0.0, Entity())
+        self.assertEqual(100, level.calculate_max_id())
+        self.assertEqual(100, level._next_id - 1)
+
+        level.props[150] = (19, 0.0, 0.0, prop)
+        level.entities[160] = (0.0, 0.0, Entity())
+        level._next_id = 500
+        self.assertEqual(499, level.calculate_max_id(reset=False))
+        self.assertEqual(160, level.calculate_max_id())
@@ -0,0 +1,25 @@
+"""
+Unit tests for replay containers
+"""
+
+import unittest
+
+from dustmaker.replay import EntityData, EntityFrame
+
+
+class TestReplayUnit(unittest.TestCase):
+    """
+    Unit tests for dustmaker replay containers
+    """
+
+    def test_entity_get_frame(self):
+        """Test looking up the most recent desync frame"""
+        entity = EntityData()
+        self.assertIsNone(entity.get_frame(0))
+
+        entity.frames = [EntityFrame(frame=frame) for frame in (8, 16, 24, 48)]
+        self.assertIsNone(entity.get_frame(7))
+        for frame, expected in ((8, 8), (15, 8), (16, 16), (47, 24), (1000, 48)):
+            result = entity.get_frame(frame)
+            assert result is not None
+            self.assertEqual(expected, result.frame)
@@ -8,6 +8,7 @@ import random
 import unittest
 from typing import Dict
 
+from dustmaker.exceptions import LevelParseException
 from dustmaker.tile import Tile, TileEdgeData, TileShape, TileSide, TileSpriteSet
 from dustmaker.transform import TxMatrix
 
@@ -686,3 +687,136 @@ class TestTileUnit(unittest.TestCase):
                     TileShape.FULL,
                     {TileSide.BOTTOM: 1},
                 )
+
+
+class TestTileData(unittest.TestCase):
+    """
+    Unit tests for copying, comparing, and packing tile data
+    """
+
+    @seeded_rand
+    def test_edge_reset(self, rng: random.Random):
+        """reset restores default edge data"""
+        edge = rand_edge(rng)
+        edge.filth_sprite_set = TileSpriteSet.FOREST
+        edge.filth_spike = True
+        edge.reset()
+        self.assertEqual(TileEdgeData(), edge)
+
+    @seeded_rand
+    def test_clone(self, rng: random.Random):
+        """clone produces an equal but independent tile"""
+        for shape in TileShape:
+            tile = rand_tile(rng, shape)
+            ctile = tile.clone()
+            self.assertEqual(tile, ctile)
+            self.assertEqual(copy.deepcopy(tile), ctile)
+
+            ctile.edge_data[TileSide.TOP].solid = not tile.edge_data[TileSide.TOP].solid
+            self.assertNotEqual(tile, ctile)
+
+    def test_has_filth(self):
+        """has_filth checks the filth sprite set of every side"""
+        tile = Tile()
+        self.assertFalse(tile.has_filth())
+        for side in TileSide:
+            tile = Tile()
+            tile.edge_data[side].filth_sprite_set = TileSpriteSet.MANSION
+            self.assertTrue(tile.has_filth())
+
+    @seeded_rand
+    def test_key(self, rng: random.Random):
+        """_key matches exactly for equal tiles"""
+        for shape in TileShape:
+            tile = rand_tile(rng, shape)
+            ctile = tile.clone()
+            self.assertEqual(tile._key(), ctile._key())
+            hash(tile._key())
+
+            ctile.edge_data[TileSide.LEFT].angles = (1, 2)
+            tile.edge_data[TileSide.LEFT].angles = (2, 1)
+            self.assertNotEqual(tile._key(), ctile._key())
+
+    @seeded_rand
+    def test_hash(self, rng: random.Random):
+        """equal tiles hash equally and can be used in sets"""
+        tiles = [rand_tile(rng, shape) for shape in TileShape]
+        clones = [tile.clone() for tile in tiles]
+        for tile, ctile in zip(tiles, clones):
+            self.assertEqual(hash(tile), hash(ctile))
+        self.assertEqual(len(tiles), len(set(tiles + clones)))
+
+    @seeded_rand
+    def test_pack_tile_data(self, rng: random.Random):
+        """tile data packs to the binary format and unpacks back"""
+        tile = Tile(
+            TileShape.BIG_1,
+            sprite_set=TileSpriteSet.FOREST,
+            sprite_tile=13,
+            sprite_palette=2,
+        )
+        tile.edge_data[TileSide.TOP] = TileEdgeData(
+            solid=True, visible=True, caps=(True, False), angles=(5, -3)
+        )
+        tile.edge_data[TileSide.LEFT] = TileEdgeData(
+            solid=True, caps=(True, False), angles=(-128, 127)
+        )
+        tile.edge_data[TileSide.BOTTOM] = TileEdgeData(
+            visible=True, caps=(False, True), angles=(1, 2)
+        )
+        expected_data = b'5%\x05\xfd\x02\x01\x7f\x80\x00\x00"\r'
+        self.assertEqual(expected_data, tile._pack_tile_data())
+        self.assertEqual(tile, Tile(TileShape.BIG_1, _tile_data=expected_data))
+
+        for shape in TileShape:
+            tile = rand_tile(rng, shape)
+            tile.sprite_palette = rng.randint(0, 15)
+            for edge in tile.edge_data:
+                edge.filth_caps = (False, False)
+                edge.filth_angles = (0, 0)
+            utile = Tile(shape, _tile_data=tile._pack_tile_data())
+            self.assertEqual(tile, utile)
+
+    def test_unpack_bad_sprite_set(self):
+        """unknown sprite sets in tile data raise a parse error"""
+        for sprite_set in range(len(TileSpriteSet), 16):
+            tile_data = bytes(10) + bytes((0x30 | sprite_set, 0))
+            with self.assertRaises(LevelParseException):
+                Tile(TileShape.FULL, _tile_data=tile_data)
+
+    @seeded_rand
+    def test_pack_dust_data(self, rng: random.Random):
+        """dust data packs to the binary format and unpacks back"""
+        tile = Tile(TileShape.FULL)
+        tile.edge_data[TileSide.TOP] = TileEdgeData(
+            filth_sprite_set=TileSpriteSet.MANSION,
+            filth_caps=(True, False),
+            filth_angles=(5, -3),
+        )
+        tile.edge_data[TileSide.LEFT] = TileEdgeData(
+            filth_sprite_set=TileSpriteSet.CITY,
+            filth_spike=True,
+            filth_caps=(True, False),
+            filth_angles=(-128, 127),
+        )
+        tile.edge_data[TileSide.RIGHT] = TileEdgeData(
+            filth_sprite_set=TileSpriteSet.NEXUS,
+            filth_caps=(False, True),
+            filth_angles=(1, 2),
+        )
+        expected_data = b"\x01k\x05\xfd\x00\x00\x7f\x80\x01\x02\xa1\x00"
+        self.assertEqual(expected_data, tile._pack_dust_data())
+        self.assertEqual(tile, Tile(TileShape.FULL, _dust_data=expected_data))
+
+        for shape in TileShape:
+            tile = rand_tile(rng, shape)
+            tile.sprite_palette = rng.randint(0, 15)
+            for edge in tile.edge_data:
+                edge.filth_sprite_set = rng.choice(list(TileSpriteSet))
+                edge.filth_spike = rng.choice((False, True))
+            utile = Tile(
+                shape,
+                _tile_data=tile._pack_tile_data(),
+                _dust_data=tile._pack_dust_data(),
+            )
+            self.assertEqual(tile, utile)